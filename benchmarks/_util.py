@@ -0,0 +1,23 @@
+"""Общие помощники замеров: время вызова и запуск замера в свежем процессе"""
+import subprocess
+import sys
+import time
+
+
+def timed(func, *args, **kwargs):
+    """Результат func(*args, **kwargs) и время вызова в секундах"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_child(module: str, *args) -> str:
+    """Стандартный вывод python -m module args.
+
+    Каждый замер — в свежем процессе: кэши импорта и пиковый RSS родителя
+    (Linux сохраняет его в потомке) не влияют на результат.
+    """
+    return subprocess.run(
+        [sys.executable, '-m', module, *args],
+        capture_output=True, text=True, check=True,
+    ).stdout
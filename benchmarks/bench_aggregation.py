@@ -0,0 +1,44 @@
+"""Однопроходная агрегация (core.aggregation) против трёх groupby из прежнего try_analyze.
+
+Запуск: python -m benchmarks.bench_aggregation [число_строк ...]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+from core.aggregation import aggregate_sales
+from benchmarks._util import timed
+from benchmarks.synthetic import make_sales_lines
+
+KEYS = [StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA]
+
+
+def aggregate_groupby(sales: pd.DataFrame):
+    """Прежний способ: отдельные groupby для ABC, помесячных сумм и mean/std/count"""
+    abc_df = sales.groupby(KEYS)[StandardColumns.SUMMA].sum().reset_index()
+    monthly_sales = sales.groupby(KEYS + [StandardColumns.MESYAC])[StandardColumns.SUMMA].sum().reset_index()
+    stats = monthly_sales.groupby(KEYS)[StandardColumns.SUMMA].agg(['mean', 'std', 'count']).reset_index()
+    return abc_df, stats
+
+
+def aggregate_single_pass(sales: pd.DataFrame):
+    aggregates = aggregate_sales(sales)
+    return aggregates.abc_frame(), aggregates.monthly_stats()
+
+
+def main(sizes):
+    for n in sizes:
+        sales = make_sales_lines(n)
+        (abc_old, stats_old), t_old = timed(aggregate_groupby, sales)
+        (abc_new, stats_new), t_new = timed(aggregate_single_pass, sales)
+
+        assert np.allclose(abc_old[StandardColumns.SUMMA], abc_new[StandardColumns.SUMMA])
+        for col in ('mean', 'std', 'count'):
+            assert np.allclose(stats_old[col], stats_new[col], equal_nan=True), col
+        print(f'{n:>9} строк, {len(abc_new)} позиций: groupby {t_old:7.3f} с, '
+              f'один проход {t_new:7.3f} с, ускорение x{t_old / t_new:.1f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,32 @@
+"""Выгрузка результата: прежний DataFrame.to_excel против core.exporter (xlsx/CSV/Parquet).
+
+Запуск: python -m benchmarks.bench_export [число_строк_продаж ...]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from config.schema import Thresholds
+from core.exporter import export_result
+from core.pipeline import AnalysisPipeline
+from benchmarks._util import timed
+from benchmarks.synthetic import make_sales_lines
+
+
+def main(sizes):
+    stock = pd.DataFrame({'Артикул': pd.Series(dtype=object), 'Остаток': pd.Series(dtype=float)})
+    for n in sizes:
+        df = AnalysisPipeline(Thresholds()).run(make_sales_lines(n, n_skus=60000), stock)
+        with tempfile.TemporaryDirectory() as tmp:
+            _, t_old = timed(df.to_excel, Path(tmp) / 'old.xlsx', index=False)
+            times = {
+                ext: timed(export_result, df, Path(tmp) / f'new{ext}')[1]
+                for ext in ('.xlsx', '.csv', '.parquet')
+            }
+        print(f'{len(df):>7} позиций: to_excel {t_old:7.2f} с, '
+              + ', '.join(f'{ext[1:]} {t:6.2f} с' for ext, t in times.items()))
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100_000, 300_000])
@@ -0,0 +1,75 @@
+"""Сравнение векторного разбора отчёта продаж с прежним построчным циклом.
+
+Запуск: python -m benchmarks.bench_load_sales [число_строк ...]
+"""
+import sys
+
+import pandas as pd
+from config.column_schema import StandardColumns
+from core.data_normalizer import DataNormalizer
+from core.load_sales_detailed import parse_sales_frame
+from core.periods import parse_periods
+from benchmarks._util import timed
+from benchmarks.synthetic import make_sales_raw
+
+
+def parse_sales_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """Прежняя реализация load_sales_detailed (эталон для сравнения)"""
+    records = []
+    current_sklad = None
+    current_month = None
+
+    for i in range(1, len(df)):
+        row = df.iloc[i]
+        cell = str(row[0]).strip()
+
+        if 'склад' in cell.lower():
+            current_sklad = cell
+            continue
+
+        if any(m in cell.lower() for m in ('янв', 'фев', 'мар', 'апр', 'май', 'июн', 'июл', 'авг', 'сен', 'окт', 'ноя', 'дек')):
+            current_month = cell
+            continue
+
+        if ',' in cell:
+            parts = cell.split(',', 1)
+            artikul = parts[0].strip().lower()
+            name = parts[1].strip()
+
+            try:
+                qty = float(str(row[1]).replace(" ", "").replace(",", "."))
+            except:
+                qty = 0
+
+            try:
+                revenue = float(str(row[2]).replace(" ", "").replace(",", "."))
+            except:
+                revenue = 0
+
+            records.append({
+                "Склад": current_sklad,
+                "Месяц": current_month,
+                StandardColumns.ARTIKUL: artikul,
+                StandardColumns.NOMENCLATURA: name,
+                "Количество": qty,
+                "Выручка": revenue,
+            })
+
+    df = pd.DataFrame(records)
+    df = DataNormalizer.normalize_sales(df)
+    return df
+
+
+def main(sizes):
+    for n in sizes:
+        raw = make_sales_raw(n)
+        expected, t_loop = timed(parse_sales_loop, raw)
+        actual, t_vec = timed(parse_sales_frame, raw)
+        # Месяц теперь — код периода; категории и float32 сравниваем в типах прежнего результата
+        expected[StandardColumns.MESYAC] = parse_periods(expected[StandardColumns.MESYAC])
+        pd.testing.assert_frame_equal(actual.astype(expected.dtypes.to_dict()), expected, check_dtype=False)
+        print(f'{len(raw):>9} строк: цикл {t_loop:8.3f} с, векторно {t_vec:8.3f} с, ускорение x{t_loop / t_vec:.1f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,58 @@
+"""Разбор чисел: прежний построчный float(str(x).replace(...)) против core.numeric_parser.
+
+Колонка как в отчёте из Excel: в основном числа, часть — текст в «русском»
+формате (пробелы всех видов между разрядами, десятичная запятая, минус в
+скобках) и немного мусора.
+Запуск: python -m benchmarks.bench_numeric_parser [число_ячеек ...]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+from core.numeric_parser import parse_numbers
+from benchmarks._util import timed
+
+SEPARATORS = ('\u0020', '\u00a0', '\u202f', '\u2009')
+
+
+def make_cells(n: int, text_share: float = 0.3, garbage_share: float = 0.001, seed: int = 0) -> pd.Series:
+    """Ячейки колонки и ожидаемые значения (NaN — мусор)"""
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.lognormal(8, 2, n), 2)
+    values[rng.random(n) < 0.05] *= -1
+    cells = values.astype(object)
+    as_text = np.flatnonzero(rng.random(n) < text_share)
+    for i, sep in zip(as_text, rng.choice(SEPARATORS, len(as_text))):
+        text = f'{abs(values[i]):,.2f}'.replace(',', sep).replace('.', ',')
+        cells[i] = f'({text})' if values[i] < 0 else text
+    garbage = np.flatnonzero(rng.random(n) < garbage_share)
+    cells[garbage] = 'н/д'
+    values[garbage] = np.nan
+    return pd.Series(cells, dtype=object), values
+
+
+def parse_per_cell(col: pd.Series) -> np.ndarray:
+    """Прежний способ: каждая ячейка отдельно, ошибка — 0"""
+    def parse(x):
+        try:
+            return float(str(x).replace(' ', '').replace(',', '.'))
+        except:  # noqa: E722  (так было в загрузчике)
+            return 0.0
+    return col.map(parse).to_numpy(dtype=float)
+
+
+def main(sizes):
+    for n in sizes:
+        cells, expected = make_cells(n)
+        old, t_old = timed(parse_per_cell, cells)
+        new, t_new = timed(parse_numbers, cells)
+        ok = np.isnan(expected)
+        wrong_old = int(np.count_nonzero(~np.isclose(old[~ok], expected[~ok])))
+        wrong_new = int(np.count_nonzero(~np.isclose(new.values[~ok], expected[~ok])))
+        print(f'{n:>9} ячеек: построчно {t_old:7.3f} с (неверно {wrong_old}), '
+              f'parse_numbers {t_new:7.3f} с (неверно {wrong_new}, не распознано {new.failed_count}), '
+              f'ускорение x{t_old / t_new:.1f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100_000, 1_000_000])
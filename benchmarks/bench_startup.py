@@ -0,0 +1,83 @@
+"""Холодный старт окна: время импорта gui.app и появления окна, бюджет запуска.
+
+До появления окна не должны импортироваться pandas, numpy и загрузчики core —
+они подгружаются в фоне после старта (см. AppGUI._preload). Каждый замер
+выполняется в свежем процессе; при превышении бюджета код возврата 1.
+
+Запуск: python -m benchmarks.bench_startup [число_замеров]
+"""
+import json
+import statistics
+import sys
+import time
+
+from benchmarks._util import run_child
+
+# Бюджет от запуска процесса до появления окна (без учёта старта самого Python)
+STARTUP_BUDGET_S = 0.5
+# Модули, которые не должны загружаться до появления окна
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'openpyxl', 'core.pipeline', 'core.load_sales_detailed')
+
+
+def measure() -> None:
+    """Выполняется в дочернем процессе: импорт gui.app и (если есть дисплей) создание окна"""
+    start = time.perf_counter()
+    import gui.app
+    imported = time.perf_counter() - start
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    window = None
+    import tkinter as tk
+    try:
+        # AppGUI сам создаёт корневое окно Tk
+        app = gui.app.AppGUI()
+    except tk.TclError:  # нет дисплея — замеряем только импорт
+        pass
+    else:
+        app.root.update()
+        window = time.perf_counter() - start
+        app.root.destroy()
+
+    print(json.dumps({'import_seconds': imported, 'window_seconds': window, 'heavy_modules': heavy}))
+
+
+def run(repeat: int = 5) -> dict:
+    """Замеры в свежих процессах; возвращает медианы и признак укладывания в бюджет"""
+    runs = []
+    for _ in range(repeat):
+        out = run_child('benchmarks.bench_startup', '--measure')
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    windows = [r['window_seconds'] for r in runs if r['window_seconds'] is not None]
+    result = {
+        'import_seconds': round(statistics.median(r['import_seconds'] for r in runs), 4),
+        'window_seconds': round(statistics.median(windows), 4) if windows else None,
+        'heavy_modules': sorted({name for r in runs for name in r['heavy_modules']}),
+        'budget_seconds': STARTUP_BUDGET_S,
+    }
+    measured = result['window_seconds'] if windows else result['import_seconds']
+    result['within_budget'] = measured <= STARTUP_BUDGET_S and not result['heavy_modules']
+    return result
+
+
+def print_result(result: dict) -> None:
+    window = result['window_seconds']
+    print(f'импорт gui.app {result["import_seconds"]:.3f} с, окно '
+          + (f'{window:.3f} с' if window is not None else '— (нет дисплея)')
+          + f', бюджет {result["budget_seconds"]:.2f} с')
+    if result['heavy_modules']:
+        print('  до появления окна загружены: ' + ', '.join(result['heavy_modules']))
+    print('  в пределах бюджета' if result['within_budget'] else '  БЮДЖЕТ ПРЕВЫШЕН')
+
+
+def main(repeat: int) -> None:
+    result = run(repeat)
+    print_result(result)
+    sys.exit(0 if result['within_budget'] else 1)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure()
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
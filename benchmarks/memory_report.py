@@ -0,0 +1,80 @@
+"""Отчёт о памяти: прежние типы колонок (строки object, float64) против компактных (category, float32).
+
+Разобранные продажи в обоих вариантах загружаются и анализируются в отдельном
+процессе, чтобы пиковый RSS одного варианта не влиял на другой.
+Запуск: python -m benchmarks.memory_report [число_строк]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from benchmarks._util import run_child
+
+VARIANTS = ('before', 'after')
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в МБ"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def legacy_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Типы колонок, как до перехода на category/float32"""
+    return df.astype({
+        col: object if isinstance(dtype, pd.CategoricalDtype) else 'float64'
+        for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype) or dtype == 'float32'
+    })
+
+
+def run_variant(sales_path: str) -> None:
+    """Выполняется в дочернем процессе: загрузка разобранных продаж + расчёт, печать замеров"""
+    from config.schema import Thresholds
+    from core.pipeline import AnalysisPipeline
+
+    stock = pd.DataFrame({'Артикул': pd.Series(dtype=object), 'Остаток': pd.Series(dtype=float)})
+    base = peak_rss_mb()
+
+    sales = pd.read_pickle(sales_path)
+    frame_mb = sales.memory_usage(deep=True).sum() / 2 ** 20
+    AnalysisPipeline(Thresholds()).run(sales, stock)
+    print(f'{base:.1f} {peak_rss_mb():.1f} {frame_mb:.1f}')
+
+
+def prepare(n_lines: int, out_dir: str) -> None:
+    """Выполняется в дочернем процессе: готовит продажи в обоих вариантах типов"""
+    from benchmarks.synthetic import make_sales_raw
+    from core.load_sales_detailed import parse_sales_frame
+
+    sales = parse_sales_frame(make_sales_raw(n_lines, n_skus=60000, n_warehouses=5, n_months=24))
+    legacy_dtypes(sales).to_pickle(Path(out_dir) / 'before.pkl')
+    sales.to_pickle(Path(out_dir) / 'after.pkl')
+
+
+def main(n_lines: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        run_child('benchmarks.memory_report', '--prepare', str(n_lines), tmp)
+
+        print(f'{n_lines} строк отчёта продаж')
+        print(f'{"вариант":>8} {"RSS до, МБ":>12} {"пик RSS, МБ":>12} {"прирост, МБ":>12} {"продажи, МБ":>12}')
+        for variant in VARIANTS:
+            out = run_child('benchmarks.memory_report', '--variant', str(Path(tmp) / f'{variant}.pkl')).split()
+            base, peak, frame = map(float, out[-3:])
+            print(f'{variant:>8} {base:12.1f} {peak:12.1f} {peak - base:12.1f} {frame:12.1f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--prepare':
+        prepare(int(sys.argv[2]), sys.argv[3])
+    elif len(sys.argv) > 1 and sys.argv[1] == '--variant':
+        run_variant(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
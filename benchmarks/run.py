@@ -0,0 +1,183 @@
+"""Замеры всех этапов на синтетических отчётах: время и пиковая память, результат — в JSON.
+
+Для каждого размера отчёты генерируются в отдельном процессе, этапы
+выполняются в другом: пиковый RSS измеряется без влияния генератора.
+
+Отдельно замеряется холодный старт окна и сверяется с бюджетом
+(benchmarks.bench_startup).
+
+Запуск:
+    python -m benchmarks.run [число_строк ...] [--out результаты.json]
+    python -m benchmarks.run --compare было.json стало.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import bench_startup
+from benchmarks._util import run_child
+from benchmarks.memory_report import peak_rss_mb
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def dataset_shape(n_lines: int) -> dict:
+    """Параметры отчёта для размера: число позиций растёт со строками, до 60 тыс."""
+    return {'n_skus': max(100, min(60_000, n_lines // 10)), 'n_warehouses': 5, 'n_months': 24}
+
+
+def prepare(n_lines: int, out_dir: str) -> None:
+    """Выполняется в дочернем процессе: пишет книги продаж и остатков"""
+    from benchmarks.synthetic import write_sales_workbook, write_stock_workbook
+
+    shape = dataset_shape(n_lines)
+    write_sales_workbook(str(Path(out_dir) / 'sales.xlsx'), n_lines, text_numbers=0.1, **shape)
+    write_stock_workbook(str(Path(out_dir) / 'stock.xlsx'), shape['n_skus'])
+
+
+def measure(out_dir: str) -> None:
+    """Выполняется в дочернем процессе: все этапы по очереди, печать замеров в JSON"""
+    from config.schema import Thresholds
+    from core.aggregation import aggregate_sales
+    from core.analyzer import ABCAnalyzer, XYZAnalyzer
+    from core.exporter import export_result
+    from core.file_loader import load_stock
+    from core.load_sales_detailed import load_sales_detailed
+    from core.parallel_loader import load_inputs
+    from core.pipeline import AnalysisPipeline
+    from core.ranking import RevenueRanking, revenue_share_positions, top_n
+    from core.search_index import SearchIndex
+    from core.sort_index import SortIndex
+    from gui.app import SEARCH_COLUMNS
+    from gui.virtual_table import format_display_rows
+
+    out_dir = Path(out_dir)
+    thresholds = Thresholds()
+    stages = {}
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        stages[name] = {'seconds': round(time.perf_counter() - start, 4), 'peak_rss_mb': round(peak_rss_mb(), 1)}
+        return result
+
+    stages['start'] = {'seconds': 0.0, 'peak_rss_mb': round(peak_rss_mb(), 1)}
+    sales = stage('load_sales', load_sales_detailed, str(out_dir / 'sales.xlsx'))
+    stock = stage('load_stock', load_stock, str(out_dir / 'stock.xlsx'))
+    # Те же два файла одновременно, в двух процессах
+    stage('load_parallel', load_inputs, str(out_dir / 'sales.xlsx'), str(out_dir / 'stock.xlsx'), 2)
+    aggregates = stage('aggregate', aggregate_sales, sales)
+    stage('abc', ABCAnalyzer(thresholds).analyze, aggregates.abc_frame())
+    # Запросы по выручке: полное ранжирование против argpartition
+    stage('ranking', RevenueRanking, aggregates.totals)
+    stage('top_100', top_n, aggregates.totals, 100)
+    stage('pareto_80', revenue_share_positions, aggregates.totals, 0.8)
+    stage('xyz', XYZAnalyzer(thresholds).analyze, aggregates.monthly_stats())
+    df = stage('classify', AnalysisPipeline(thresholds).classify, aggregates, stock)
+    # Данные update_table: готовые строки таблицы и индекс поиска (без Tk)
+    stage('display_rows', format_display_rows, df)
+    stage('search_index', SearchIndex, df, SEARCH_COLUMNS)
+    # Щелчки по заголовкам: первая сортировка строит перестановку, повторная — разворот
+    sort_index = SortIndex(df)
+    stage('sort_column', sort_index.order, [('Сумма', False)])
+    stage('sort_reverse', sort_index.order, [('Сумма', True)])
+    stage('sort_multi', sort_index.order, [('ABC', False), ('Сумма', True)])
+    stage('export_xlsx', export_result, df, str(out_dir / 'result.xlsx'))
+
+    print(json.dumps({'sales_rows': len(sales), 'positions': len(df), 'stages': stages}))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run(sizes, out_path: Path) -> dict:
+    import numpy as np
+    import pandas as pd
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'runs': [],
+    }
+    report['startup'] = bench_startup.run()
+    bench_startup.print_result(report['startup'])
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            run_child('benchmarks.run', '--prepare', str(n), tmp)
+            generated = time.perf_counter() - start
+            result = json.loads(run_child('benchmarks.run', '--measure', tmp).strip().splitlines()[-1])
+        result.update(lines=n, generate_seconds=round(generated, 2), **dataset_shape(n))
+        report['runs'].append(result)
+        print_run(result)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f'Результаты сохранены: {out_path}')
+    return report
+
+
+def print_run(result: dict) -> None:
+    print(f'{result["lines"]} строк, {result["positions"]} позиций')
+    for name, values in result['stages'].items():
+        print(f'  {name:<14} {values["seconds"]:9.3f} с  пик RSS {values["peak_rss_mb"]:8.1f} МБ')
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Печатает время этапов двух запусков и отношение стало/было"""
+    old, new = (json.loads(Path(p).read_text(encoding='utf-8')) for p in (old_path, new_path))
+    old_runs = {r['lines']: r for r in old['runs']}
+    print(f'было: {old.get("commit") or old_path}, стало: {new.get("commit") or new_path}')
+    if old.get('startup') and new.get('startup'):
+        print(f'  {"import gui.app":<14} {old["startup"]["import_seconds"]:9.3f} с -> '
+              f'{new["startup"]["import_seconds"]:9.3f} с')
+    for run_new in new['runs']:
+        run_old = old_runs.get(run_new['lines'])
+        if run_old is None:
+            continue
+        print(f'{run_new["lines"]} строк')
+        for name, values in run_new['stages'].items():
+            before = run_old['stages'].get(name)
+            if before is None or not before['seconds']:
+                continue
+            ratio = values['seconds'] / before['seconds']
+            print(f'  {name:<14} {before["seconds"]:9.3f} с -> {values["seconds"]:9.3f} с  x{ratio:.2f}')
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Замеры этапов ABC/XYZ-анализа')
+    parser.add_argument('sizes', nargs='*', type=int, help='число строк продаж (по умолчанию 1k ... 1M)')
+    parser.add_argument('--out', help='файл JSON (по умолчанию benchmarks/results/<дата>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('БЫЛО', 'СТАЛО'), help='сравнить два файла результатов')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    out_path = Path(args.out) if args.out else RESULTS_DIR / f'{datetime.now():%Y%m%d-%H%M%S}.json'
+    run(args.sizes or DEFAULT_SIZES, out_path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--prepare':
+        prepare(int(sys.argv[2]), sys.argv[3])
+    elif len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(sys.argv[2])
+    else:
+        main()
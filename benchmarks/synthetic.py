@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from core.periods import PERIOD_DTYPE, period_code, period_label
+
+
+def make_sales_raw(n_lines: int, n_skus: int = 5000, n_warehouses: int = 3,
+                   n_months: int = 12, seed: int = 0) -> pd.DataFrame:
+    """Строит «сырой» лист отчёта продаж так, как его возвращает pd.read_excel(header=None)"""
+    rng = np.random.default_rng(seed)
+    blocks = n_warehouses * n_months
+    per_block = max(1, n_lines // blocks)
+
+    col0, col1, col2 = ['Отчёт о продажах'], [None], [None]
+    for w in range(n_warehouses):
+        col0.append(f'Склад {w + 1}')
+        col1.append(None)
+        col2.append(None)
+        for m in range(n_months):
+            col0.append(period_label(period_code(2024, 1) + m))
+            col1.append(None)
+            col2.append(None)
+
+            skus = rng.integers(0, n_skus, per_block)
+            qty = rng.integers(1, 50, per_block)
+            price = rng.uniform(10, 5000, per_block).round(2)
+            col0.extend(f'ART{s:06d}, Товар номер {s}' for s in skus)
+            col1.extend(qty.tolist())
+            col2.extend((qty * price).round(2).tolist())
+
+    return pd.DataFrame({0: col0, 1: col1, 2: col2})
+
+
+def make_sales_lines(n_lines: int, n_skus: int = 60000, n_warehouses: int = 5,
+                     n_months: int = 24, seed: int = 0) -> pd.DataFrame:
+    """Строит уже разобранные строки продаж (как после load_sales_detailed)"""
+    rng = np.random.default_rng(seed)
+    skus = rng.integers(0, n_skus, n_lines)
+    months = rng.integers(0, n_months, n_lines)
+    qty = rng.integers(1, 50, n_lines).astype(float)
+    # Месяц — код периода, как после load_sales_detailed (core.periods): с января 2024
+    first_period = period_code(2024, 1)
+    warehouse_labels = np.array([f'Склад {w + 1}' for w in range(n_warehouses)], dtype=object)
+    sku_labels = np.array([f'art{s:06d}' for s in range(n_skus)], dtype=object)
+    name_labels = np.array([f'Товар номер {s}' for s in range(n_skus)], dtype=object)
+
+    return pd.DataFrame({
+        'Склад': warehouse_labels[rng.integers(0, n_warehouses, n_lines)],
+        'Месяц': pd.array(first_period + months, dtype=PERIOD_DTYPE),
+        'Артикул': sku_labels[skus],
+        'Номенклатура': name_labels[skus],
+        'Количество': qty,
+        'Сумма': (qty * rng.uniform(10, 5000, n_lines)).round(2),
+    })
+
+
+def _text_number(value) -> str:
+    # Число так, как его выгружают в текстовые ячейки: 1 234,50
+    return f'{value:,.2f}'.replace(',', ' ').replace('.', ',')
+
+
+def write_sales_workbook(path: str, n_lines: int, n_skus: int = 5000, n_warehouses: int = 3,
+                         n_months: int = 12, seed: int = 0, text_numbers: float = 0.0) -> Path:
+    """Пишет xlsx отчёта продаж в формате, который ждёт load_sales_detailed.
+
+    Первая строка — заголовок отчёта, дальше строки «Склад N», месяца и
+    «артикул, название» с количеством и выручкой. Доля text_numbers числовых
+    ячеек записывается текстом с пробелами и десятичной запятой.
+    """
+    from openpyxl import Workbook
+
+    raw = make_sales_raw(n_lines, n_skus, n_warehouses, n_months, seed)
+    as_text = np.random.default_rng(seed + 1).random(len(raw)) < text_numbers
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Продажи')
+    for label, qty, revenue, text in zip(raw[0], raw[1], raw[2], as_text):
+        if text and revenue is not None:
+            qty, revenue = _text_number(qty), _text_number(revenue)
+        sheet.append([label, qty, revenue])
+    workbook.save(path)
+    return Path(path)
+
+
+def write_stock_workbook(path: str, n_skus: int = 5000, coverage: float = 0.9, seed: int = 0) -> Path:
+    """Пишет xlsx остатков в формате load_stock: шапка из 4 строк, заголовки колонок в 5-й.
+
+    coverage — доля позиций каталога, по которым есть строка остатков.
+    """
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    skus = np.flatnonzero(rng.random(n_skus) < coverage)
+    quantities = rng.integers(0, 500, len(skus))
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Остатки')
+    sheet.append(['Остатки товаров на складах'])
+    sheet.append(['Сформирован: синтетический отчёт'])
+    sheet.append([])
+    sheet.append([])
+    sheet.append(['Артикул', 'Номенклатура', 'Количество'])
+    for s, qty in zip(skus.tolist(), quantities.tolist()):
+        sheet.append([f'ART{s:06d}', f'Товар номер {s}', qty])
+    workbook.save(path)
+    return Path(path)
@@ -0,0 +1,293 @@
+"""Консольный (пакетный) режим ABC/XYZ-анализа без GUI.
+
+Примеры:
+    python cli.py --sales "data/*_продажи.xlsx" --stock "data/*_остатки.xlsx" --out results
+    python cli.py --sales 2024_*.xlsx --stock остатки.xlsx --format csv --jobs 8 --a 0.75
+
+Файлы продаж и остатков сопоставляются попарно в порядке сортировки имён;
+если файл остатков один, он используется для всех файлов продаж.
+
+Инкрементальный режим (--state): файлы продаж с новыми месяцами добавляются
+к сохранённому состоянию, вся история заново не разбирается:
+    python cli.py --state магазин1.state --sales 2025-01.xlsx --stock остатки.xlsx --window 24
+
+XYZ считается по месяцам, в которых у позиции были продажи; с
+--include-empty-months — по всем месяцам отчёта, пустые месяцы дают 0.
+
+Кроме таблицы результата сохраняются сводки: в xlsx — отдельными листами,
+в CSV/Parquet — файлами *_classes (по кодам ABC_XYZ), *_warehouses (по складам)
+и *_top (позиции с наибольшей выручкой). В журнал пишется, сколько позиций
+дают 80% выручки.
+
+Несколько файлов продаж можно объединить в один отчёт (--merge-sales), а
+--all-sheets разбирает все листы книг продаж, а не только первый. Файлы
+и листы разбираются параллельно, вместе с файлом остатков.
+
+Анализ по складам (--by-warehouse): классы по каждому складу и по сети:
+    python cli.py --sales продажи.xlsx --stock остатки.xlsx --by-warehouse --jobs 4
+
+Время, строки и память каждого этапа пишутся в журнал (--log-file);
+--profile (или переменная окружения ABC_XYZ_PROFILE=1) сохраняет профиль cProfile.
+"""
+import argparse
+import glob
+import logging
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Tuple
+
+from pydantic import ValidationError
+from config.column_schema import StandardColumns
+from config.schema import AppConfig, Thresholds
+from core.exporter import export_result
+from core.file_loader import load_stock
+from core.instrumentation import DEFAULT_LOG_DIR, StageLog, profiled, profiling_enabled, set_profiling, setup_logging
+from core.incremental import IncrementalAnalysis
+from core.parallel_loader import load_frames, load_inputs, sales_tasks
+from core.periods import period_label
+from core.pipeline import NETWORK_LABEL, AnalysisPipeline
+from core.ranking import revenue_share_positions
+
+logger = logging.getLogger('abc_xyz.cli')
+
+OUTPUT_FORMATS = {'xlsx': '.xlsx', 'csv': '.csv', 'parquet': '.parquet'}
+# Доля выручки для строки журнала «столько-то позиций дают 80% выручки»
+PARETO_SHARE = 0.8
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Раскрывает маски файлов; пути без масок возвращаются как есть"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches and not glob.has_magic(pattern):
+            matches = [pattern]
+        paths.extend(matches)
+    return paths
+
+
+def pair_files(sales: List[str], stock: List[str]) -> List[Tuple[str, str]]:
+    """Сопоставляет файлы продаж и остатков"""
+    if not sales:
+        raise ValueError('Не найдено ни одного файла продаж')
+    if len(stock) == 1:
+        return [(s, stock[0]) for s in sales]
+    if len(stock) != len(sales):
+        raise ValueError(
+            f'Число файлов остатков ({len(stock)}) должно быть 1 или совпадать с числом файлов продаж ({len(sales)})'
+        )
+    return list(zip(sales, stock))
+
+
+def merge_files(sales: List[str], stock: List[str]) -> List[Tuple[List[str], str]]:
+    """--merge-sales: все файлы продаж — одна пара с единственным файлом остатков"""
+    if not sales:
+        raise ValueError('Не найдено ни одного файла продаж')
+    if len(stock) != 1:
+        raise ValueError(f'Для --merge-sales нужен один файл остатков, найдено: {len(stock)}')
+    return [(sales, stock[0])]
+
+
+def output_stem(sales_path) -> str:
+    """Имя результата по файлу продаж; для объединённых файлов — по первому с пометкой"""
+    if isinstance(sales_path, str):
+        return Path(sales_path).stem
+    return Path(sales_path[0]).stem + ('_merged' if len(sales_path) > 1 else '')
+
+
+def output_stems(pairs) -> List[str]:
+    """Имена результатов для пар без совпадений.
+
+    Одинаковые имена файлов из разных каталогов (магазинА/2025-01.xlsx,
+    магазинБ/2025-01.xlsx) получают приставку — имя каталога, а если и
+    она совпала — номер, иначе параллельные задачи перезапишут файлы друг друга.
+    """
+    stems = [output_stem(sales_path) for sales_path, _ in pairs]
+    counts = Counter(stems)
+    for i, (sales_path, _) in enumerate(pairs):
+        if counts[stems[i]] > 1:
+            first = Path(sales_path if isinstance(sales_path, str) else sales_path[0])
+            stems[i] = f'{first.resolve().parent.name}_{stems[i]}'
+
+    seen = Counter()
+    for i, stem in enumerate(stems):
+        seen[stem] += 1
+        if seen[stem] > 1:
+            stems[i] = f'{stem}_{seen[stem]}'
+    return stems
+
+
+def log_pareto(name: str, df) -> None:
+    """Пишет в журнал, сколько позиций дают PARETO_SHARE выручки (по сети, если есть склады)"""
+    if StandardColumns.SKLAD in df.columns:
+        df = df[df[StandardColumns.SKLAD] == NETWORK_LABEL]
+    positions = revenue_share_positions(df[StandardColumns.SUMMA].to_numpy(dtype=float), PARETO_SHARE)
+    logger.info('%s: %.0f%% выручки дают %d позиций из %d', name, PARETO_SHARE * 100, len(positions), len(df))
+
+
+def process_pair(sales_path, stock_path: str, out_path: str, summaries: bool, thresholds: dict,
+                 log_file: str = None, profile: bool = False, jobs: int = 1, all_sheets: bool = False,
+                 include_empty_months: bool = False) -> int:
+    """Обрабатывает одну пару файлов (выполняется в отдельном процессе).
+
+    sales_path — файл или список файлов продаж (--merge-sales); jobs — процессов на разбор файлов пары.
+    """
+    setup_logging(log_file)
+    set_profiling(profile, Path(log_file).parent if log_file else None)
+    pipeline = AnalysisPipeline(Thresholds(**thresholds), include_empty_months=include_empty_months)
+    name = Path(sales_path if isinstance(sales_path, str) else sales_path[0])
+    with StageLog(name.name) as log, profiled(name.stem):
+        df = pipeline.run_files(sales_path, stock_path, jobs=jobs, all_sheets=all_sheets)
+        export_result(df, out_path, summaries=summaries)
+        log_pareto(name.name, df)
+    log.write()
+    return len(df)
+
+
+def run_by_warehouse(args, thresholds: Thresholds, out_dir: Path, suffix: str, pairs) -> int:
+    """Анализ по складам: пары обрабатываются по очереди, склады — в --jobs процессах"""
+    pipeline = AnalysisPipeline(thresholds, include_empty_months=args.include_empty_months)
+    jobs = args.jobs or os.cpu_count() or 1
+    failed = 0
+    for (sales_path, stock_path), stem in zip(pairs, output_stems(pairs)):
+        out_path = out_dir / f'{stem}_abc_xyz{suffix}'
+        try:
+            with StageLog(stem) as log, profiled(stem):
+                sales, stock = load_inputs(sales_path, stock_path, jobs, args.all_sheets)
+                df, matrix = pipeline.run_by_warehouse(sales, stock, jobs=jobs)
+                # Матрица ABC_XYZ по складам попадает в сводку «По складам»
+                export_result(df, out_path, summaries=not args.no_summary)
+                log_pareto(stem, df)
+            log.write()
+            logger.info('%s -> %s (%d строк, складов: %d)', sales_path, out_path, len(df), len(matrix) - 1)
+        except Exception as e:
+            failed += 1
+            logger.error('%s: %s', sales_path, e)
+    return 1 if failed else 0
+
+
+def run_incremental(args, thresholds: Thresholds, out_dir: Path, suffix: str) -> int:
+    """Добавляет новые месяцы к состоянию --state и пересчитывает классы по нему"""
+    stock_paths = expand_paths(args.stock)
+    if len(stock_paths) != 1:
+        logger.error('В инкрементальном режиме нужен ровно один файл остатков')
+        return 2
+
+    state_path = Path(args.state)
+    state = IncrementalAnalysis.load(str(state_path)) if state_path.exists() else IncrementalAnalysis()
+    if args.window is not None:
+        state.window = args.window
+
+    with StageLog(state_path.name) as log, profiled(state_path.stem):
+        # Все файлы (листы) продаж и остатки разбираются параллельно, а добавляются по порядку
+        tasks = sales_tasks(expand_paths(args.sales), args.all_sheets)
+        frames = load_frames(tasks + [(load_stock, stock_paths[0], {})], args.jobs)
+        for (_, sales_path, _), sales in zip(tasks, frames):
+            state.add_sales(sales)
+            window = f'{period_label(state.months[0])} — {period_label(state.months[-1])}' if state.months else '-'
+            logger.info('%s добавлен, месяцев в окне: %d (%s)', sales_path, len(state.months), window)
+        state.save(str(state_path))
+
+        pipeline = AnalysisPipeline(thresholds, include_empty_months=args.include_empty_months)
+        df = pipeline.classify(state, frames[-1])
+        out_path = out_dir / f'{state_path.stem}_abc_xyz{suffix}'
+        export_result(df, out_path, summaries=not args.no_summary)
+        log_pareto(state_path.name, df)
+    log.write()
+    logger.info('%s -> %s (%d позиций)', state_path, out_path, len(df))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    defaults = AppConfig().thresholds
+    parser = argparse.ArgumentParser(description='ABC/XYZ-анализ без GUI (пакетная обработка)')
+    parser.add_argument('--sales', nargs='+', required=True, help='файлы или маски файлов продаж')
+    parser.add_argument('--stock', nargs='+', required=True, help='файлы или маски файлов остатков')
+    parser.add_argument('--out', default='.', help='каталог для результатов (по умолчанию текущий)')
+    parser.add_argument('--format', choices=sorted(OUTPUT_FORMATS), default='xlsx', help='формат результата')
+    parser.add_argument('--no-summary', action='store_true', help='не сохранять сводки по классам и складам')
+    parser.add_argument('--jobs', type=int, default=None, help='число процессов (по умолчанию — число ядер)')
+    parser.add_argument('--a', type=float, default=defaults.A, help=f'порог класса A (по умолчанию {defaults.A})')
+    parser.add_argument('--b', type=float, default=defaults.B, help=f'порог класса B (по умолчанию {defaults.B})')
+    parser.add_argument('--x', type=float, default=defaults.X, help=f'порог класса X (по умолчанию {defaults.X})')
+    parser.add_argument('--y', type=float, default=defaults.Y, help=f'порог класса Y (по умолчанию {defaults.Y})')
+    parser.add_argument('--state', help='файл состояния для инкрементального режима')
+    parser.add_argument('--window', type=int, default=None,
+                        help='инкрементальный режим: учитывать только последние N месяцев')
+    parser.add_argument('--merge-sales', action='store_true',
+                        help='объединить все файлы продаж в один отчёт (нужен один файл остатков)')
+    parser.add_argument('--all-sheets', action='store_true', help='разбирать все листы книг продаж')
+    parser.add_argument('--include-empty-months', action='store_true',
+                        help='XYZ по всем месяцам отчёта: месяц без продаж позиции считается нулевым')
+    parser.add_argument('--by-warehouse', action='store_true',
+                        help='классы по каждому складу и по сети, плюс матрица ABC_XYZ по складам')
+    parser.add_argument('--log-file', default=str(DEFAULT_LOG_DIR / 'abc_xyz.log'),
+                        help='файл журнала с замерами этапов (пустая строка — без файла)')
+    parser.add_argument('--profile', action='store_true', help='снимать профиль cProfile (в каталог журнала)')
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    log_file = args.log_file or None
+    setup_logging(log_file)
+    if args.profile or profiling_enabled():
+        set_profiling(True, Path(log_file).parent if log_file else None)
+
+    try:
+        thresholds = Thresholds(A=args.a, B=args.b, X=args.x, Y=args.y)
+    except ValidationError as e:
+        parser.error('недопустимые пороги: ' + '; '.join(
+            f'--{error["loc"][0].lower()}: {error["msg"]}' for error in e.errors()
+        ))
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = OUTPUT_FORMATS[args.format]
+
+    if args.state:
+        return run_incremental(args, thresholds, out_dir, suffix)
+
+    try:
+        if args.merge_sales:
+            pairs = merge_files(expand_paths(args.sales), expand_paths(args.stock))
+        else:
+            pairs = pair_files(expand_paths(args.sales), expand_paths(args.stock))
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    if args.by_warehouse:
+        return run_by_warehouse(args, thresholds, out_dir, suffix, pairs)
+
+    failed = 0
+    # Ядра, не занятые парами файлов, достаются параллельному разбору файлов внутри пары
+    load_jobs = max(1, (args.jobs or os.cpu_count() or 1) // len(pairs))
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {}
+        for (sales_path, stock_path), stem in zip(pairs, output_stems(pairs)):
+            out_path = out_dir / f'{stem}_abc_xyz{suffix}'
+            future = pool.submit(process_pair, sales_path, stock_path, str(out_path),
+                                 not args.no_summary, thresholds.model_dump(),
+                                 log_file, profiling_enabled(), load_jobs, args.all_sheets,
+                                 args.include_empty_months)
+            futures[future] = (sales_path, out_path)
+
+        for future in as_completed(futures):
+            sales_path, out_path = futures[future]
+            try:
+                rows = future.result()
+                logger.info('%s -> %s (%d позиций)', sales_path, out_path, rows)
+            except Exception as e:
+                failed += 1
+                logger.error('%s: %s', sales_path, e)
+
+    logger.info('Обработано пар файлов: %d, с ошибками: %d', len(pairs) - failed, failed)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
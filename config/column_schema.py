@@ -9,8 +9,12 @@ class StandardColumns(str, Enum):
     XYZ = "XYZ"
     DOLIA = "Доля"
     NAKOPITEL = "Накопл"
+    RANG = "Ранг"             # Место позиции по выручке (1 — самая большая)
     CV = "CV"
     MESYAC = "Месяц"
+    SKLAD = "Склад"
+    ABC_XYZ = "ABC_XYZ"
+    REKOMENDACIA = "Рекомендация"
 
 class SourceColumns(str, Enum):
     # Исходные названия из файлов
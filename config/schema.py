@@ -6,5 +6,21 @@ class Thresholds(BaseModel):
     X: float = Field(default=0.1, ge=0.0)
     Y: float = Field(default=0.25, ge=0.0)
 
+class Recommendations(BaseModel):
+    # Тексты рекомендаций по кодам ABC_XYZ (таблица 3×3) и для позиций без XYZ
+    AX: str = 'Держим как зеницу ока. Продаётся отлично — пусть лежит.'
+    AY: str = 'Хитрый парень: спрос нестабильный. Запас — по ситуации.'
+    AZ: str = 'Хитрый парень: спрос нестабильный. Запас — по ситуации.'
+    BX: str = 'Норм, но не шик. Присматривай.'
+    BY: str = 'Ни рыба, ни мясо. Понаблюдай.'
+    BZ: str = 'Ни рыба, ни мясо. Понаблюдай.'
+    CX: str = 'Эй, ты чего тут делаешь? Убираем из ассортимента.'
+    CY: str = 'Серьёзно? Это ещё живо? Акции, уценка, распродажа!'
+    CZ: str = 'Серьёзно? Это ещё живо? Акции, уценка, распродажа!'
+    unknown: str = '¯\\_(ツ)_/¯ Нужна экспертная оценка.'
+
 class AppConfig(BaseModel):
     thresholds: Thresholds = Thresholds()  # ✅ Значение по умолчанию
+    recommendations: Recommendations = Recommendations()
+    # XYZ: учитывать месяцы без продаж позиции как нулевую выручку
+    include_empty_months: bool = False
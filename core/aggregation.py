@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+
+
+@dataclass
+class SalesAggregates:
+    """Агрегаты продаж для ABC и XYZ, посчитанные за один проход.
+
+    Строки всех массивов — позиции (Артикул, Номенклатура) в порядке
+    сортировки ключей, как у groupby; колонки матриц — месяцы.
+    """
+
+    skus: pd.DataFrame      # [группа,] Артикул, Номенклатура
+    months: pd.Index        # Коды периодов месяцев по возрастанию (колонки матриц)
+    revenue: np.ndarray     # Выручка позиции за месяц, (позиции x месяцы)
+    present: np.ndarray     # Были ли строки продаж позиции в месяце
+    totals: np.ndarray      # Выручка позиции за всё время (включая строки без месяца)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def abc_frame(self) -> pd.DataFrame:
+        """Вход ABCAnalyzer: позиция и её суммарная выручка"""
+        df = self.skus.copy(deep=False)
+        df[StandardColumns.SUMMA] = self.totals
+        return df
+
+    def monthly_stats(self, include_empty: bool = False) -> pd.DataFrame:
+        """mean/std/count помесячной выручки — вход XYZAnalyzer.
+
+        Учитываются только месяцы, в которых у позиции были продажи;
+        std — выборочное (ddof=1), как у pandas. include_empty — считать
+        все месяцы отчёта (см. fill_empty_months).
+        """
+        count = self.present.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = self.revenue.sum(axis=1) / count
+            deviation = np.where(self.present, self.revenue - mean[:, np.newaxis], 0.0)
+            std = np.sqrt((deviation ** 2).sum(axis=1) / (count - 1))
+        std[count < 2] = np.nan
+        if include_empty:
+            mean, std, count = fill_empty_months(mean, std, count, period_span(self.months))
+
+        df = self.skus.copy(deep=False)
+        df['mean'] = mean
+        df['std'] = std
+        df['count'] = count
+        return df
+
+
+def period_span(months) -> int:
+    """Число месяцев от первого до последнего периода включительно (с пропусками)"""
+    months = np.asarray(months, dtype=np.int64)
+    return int(months.max() - months.min() + 1) if len(months) else 0
+
+
+def fill_empty_months(mean, std, count, n_months: int):
+    """mean/std/count, если у позиции n_months месяцев, а в месяцах без продаж выручка 0.
+
+    Пересчёт по готовой статистике (count, mean, M2), без матрицы месяцев.
+    Позиции без единого месяца с продажами не меняются: XYZ у них нет.
+    """
+    mean, std = np.asarray(mean, dtype=float), np.asarray(std, dtype=float)
+    count = np.asarray(count)
+    sold = count > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m2 = np.where(count > 1, std ** 2 * (count - 1), 0.0)
+        new_mean = np.where(sold, mean * count, 0.0) / n_months
+        # Добавка к M2: сдвиг среднего и нули за месяцы без продаж
+        m2 = m2 + count * (mean - new_mean) ** 2 + (n_months - count) * new_mean ** 2
+        new_std = np.sqrt(m2 / (n_months - 1)) if n_months > 1 else np.full(len(mean), np.nan)
+    return (
+        np.where(sold, new_mean, mean),
+        np.where(sold, new_std, std),
+        np.where(sold, n_months, count),
+    )
+
+
+def aggregate_sales(sales: pd.DataFrame, group: Optional[str] = None) -> SalesAggregates:
+    """Один проход по строкам продаж: ключи кодируются целыми один раз,
+    суммы по позициям и по (позиция, месяц) набираются через bincount.
+
+    group — дополнительная колонка ключа (например, Склад): тогда строка
+    агрегатов — пара (группа, позиция), и группа идёт первой колонкой skus.
+    """
+    key_columns = ([group] if group else []) + [StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA]
+    key_codes, key_values = zip(*(pd.factorize(sales[col], sort=True) for col in key_columns))
+
+    # Строки с пустым ключом groupby отбрасывает — делаем так же
+    valid = np.logical_and.reduce([codes >= 0 for codes in key_codes])
+    sizes = [max(len(values), 1) for values in key_values]
+    combined = np.zeros(int(valid.sum()), dtype=np.int64)
+    for codes, size in zip(key_codes, sizes):
+        combined = combined * size + codes[valid]
+    sku_keys, sku_codes = np.unique(combined, return_inverse=True)
+
+    # Месяц — код периода (core.periods), так что sort=True упорядочивает по времени
+    month_codes, month_values = pd.factorize(sales[StandardColumns.MESYAC], sort=True)
+    n_sku, n_month = len(sku_keys), len(month_values)
+
+    revenue = sales[StandardColumns.SUMMA].to_numpy(dtype=float)[valid]
+    revenue = np.where(np.isnan(revenue), 0.0, revenue)  # как sum() в groupby
+    totals = np.bincount(sku_codes, weights=revenue, minlength=n_sku)
+
+    month_codes = month_codes[valid]
+    dated = month_codes >= 0
+    cells = sku_codes[dated] * n_month + month_codes[dated]
+    matrix = np.bincount(cells, weights=revenue[dated], minlength=n_sku * n_month)
+    present = np.bincount(cells, minlength=n_sku * n_month) > 0
+
+    # Раскладываем составной код обратно на значения ключей
+    skus = {}
+    rest = sku_keys
+    for col, values, size in reversed(list(zip(key_columns, key_values, sizes))):
+        skus[col] = values.take(rest % size)
+        rest = rest // size
+    skus = pd.DataFrame({col: skus[col] for col in key_columns})
+
+    return SalesAggregates(
+        skus=skus,
+        months=pd.Index(month_values, name=StandardColumns.MESYAC),
+        revenue=matrix.reshape(n_sku, n_month),
+        present=present.reshape(n_sku, n_month),
+        totals=totals,
+    )
@@ -1,54 +1,127 @@
+from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
+
 import numpy as np
 import pandas as pd
 from config.schema import Thresholds
 from config.column_schema import StandardColumns
 from core.data_normalizer import DataNormalizer
+from core.ranking import RevenueRanking
+
+
+class ThresholdClassifier(ABC):
+    """Общая часть ABC и XYZ: значение -> один из трёх классов по двум порогам.
 
+    Значение <= первого порога — первый класс, <= второго — второй, иначе
+    (в том числе NaN и inf) — третий. classify_many классифицирует сразу
+    по нескольким наборам порогов, например при подборе настроек.
+    """
+
+    labels: Tuple[str, str, str] = ('', '', '')
 
-class ABCAnalyzer:
     def __init__(self, thresholds: Thresholds):
         self.thresholds = thresholds
 
-    def analyze(self, df: pd.DataFrame) -> pd.DataFrame:
+    @abstractmethod
+    def bounds(self, thresholds: Thresholds) -> Tuple[float, float]:
+        """Два порога классификации из набора порогов"""
+
+    def classify_codes_many(self, values, thresholds_list: Sequence[Thresholds]) -> np.ndarray:
+        """Коды классов 0/1/2, массив (наборы порогов x значения)"""
+        values = np.asarray(values, dtype=float)[np.newaxis, :]
+        bounds = np.array([self.bounds(t) for t in thresholds_list], dtype=float).reshape(-1, 2)
+        first, second = bounds[:, 0:1], bounds[:, 1:2]
+        codes = np.full((len(bounds), values.shape[1]), 2, dtype=np.int8)
+        codes[values <= second] = 1
+        codes[values <= first] = 0
+        return codes
+
+    def classify_many(self, values, thresholds_list: Sequence[Thresholds]) -> np.ndarray:
+        """Метки классов, массив (наборы порогов x значения)"""
+        return np.asarray(self.labels)[self.classify_codes_many(values, thresholds_list)]
+
+    def classify(self, values, thresholds: Thresholds = None) -> np.ndarray:
+        """Метки классов по одному набору порогов (по умолчанию — текущему)"""
+        return self.classify_many(values, [thresholds or self.thresholds])[0]
+
+    def classify_categorical(self, values, thresholds: Thresholds = None) -> pd.Categorical:
+        """Классы по одному набору порогов как категории: в строках только коды 0/1/2"""
+        codes = self.classify_codes_many(values, [thresholds or self.thresholds])[0]
+        return pd.Categorical.from_codes(codes, categories=list(self.labels))
+
+
+class ABCAnalyzer(ThresholdClassifier):
+    labels = ('A', 'B', 'C')
+
+    def bounds(self, thresholds: Thresholds) -> Tuple[float, float]:
+        return thresholds.A, thresholds.B
+
+    def analyze(self, df: pd.DataFrame, group: str = None) -> pd.DataFrame:
+        """Доля, накопленная доля, ранг по выручке и класс ABC.
+
+        Накопленная доля считается по убыванию выручки (при равной выручке —
+        в порядке строк), поэтому классы не зависят от порядка строк df.
+        Если задана колонка group (например, Склад), доли, накопленные доли
+        и ранги считаются внутри каждой группы — все группы за один проход.
+        """
         # Валидация входных данных
         DataNormalizer.validate_required_columns(
-            df, [StandardColumns.SUMMA]
+            df, [StandardColumns.SUMMA] + ([group] if group else [])
         )
 
-        df = df.copy()
-        total = df[StandardColumns.SUMMA].sum()
-        df[StandardColumns.DOLIA] = df[StandardColumns.SUMMA] / total
-        df[StandardColumns.NAKOPITEL] = df[StandardColumns.DOLIA].cumsum()
-
-        condlist = [
-            df[StandardColumns.NAKOPITEL] <= self.thresholds.A,
-            df[StandardColumns.NAKOPITEL] <= self.thresholds.B
-        ]
-        choicelist = ['A', 'B']
-        df[StandardColumns.ABC] = np.select(condlist, choicelist, default='C')
+        # Поверхностная копия: новые колонки не попадают во входной DataFrame,
+        # а данные существующих колонок не дублируются
+        df = df.copy(deep=False)
+        groups = pd.factorize(df[group])[0] if group is not None else None
+        ranking = RevenueRanking(df[StandardColumns.SUMMA].to_numpy(dtype=float), groups)
+        df[StandardColumns.DOLIA] = ranking.share()
+        df[StandardColumns.NAKOPITEL] = ranking.cum_share()
+        df[StandardColumns.RANG] = ranking.rank + 1
+        df[StandardColumns.ABC] = self.classify_categorical(df[StandardColumns.NAKOPITEL].to_numpy())
         return df
 
 
-class XYZAnalyzer:
-    def __init__(self, thresholds: Thresholds):
-        self.thresholds = thresholds
+class XYZAnalyzer(ThresholdClassifier):
+    labels = ('X', 'Y', 'Z')
+
+    def bounds(self, thresholds: Thresholds) -> Tuple[float, float]:
+        return thresholds.X, thresholds.Y
+
+    @staticmethod
+    def coefficient_of_variation(mean, std, count) -> np.ndarray:
+        """CV = std / mean; для позиций с одним месяцем продаж — 0"""
+        mean, std, count = (np.asarray(a, dtype=float) for a in (mean, std, count))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(count > 1, std / mean, 0.0)
 
     def analyze(self, df: pd.DataFrame) -> pd.DataFrame:
         # Валидация входных данных
         required_stats = ['mean', 'std', 'count']
         DataNormalizer.validate_required_columns(df, required_stats)
 
-        df = df.copy()
-        df[StandardColumns.CV] = np.where(df['count'] > 1, df['std'] / df['mean'], 0)
+        df = df.copy(deep=False)
+        df[StandardColumns.CV] = self.coefficient_of_variation(df['mean'], df['std'], df['count'])
+        # NaN и inf не проходят ни один порог и попадают в Z
+        df[StandardColumns.XYZ] = self.classify_categorical(df[StandardColumns.CV].to_numpy())
+        return df
+
+
+def sweep_thresholds(cum_share, cv, thresholds_list: Sequence[Thresholds]) -> pd.DataFrame:
+    """Число позиций в каждом классе ABC/XYZ для каждого набора порогов.
 
-        def classify(cv: float) -> str:
-            if pd.isna(cv) or cv == np.inf:
-                return 'Z'
-            if cv <= self.thresholds.X:
-                return 'X'
-            elif cv <= self.thresholds.Y:
-                return 'Y'
-            return 'Z'
+    cum_share — накопленная доля выручки (колонка Накопл), cv — коэффициент
+    вариации (колонка CV). Колонки результата: пороги A/B/X/Y и число позиций
+    n_A ... n_Z. Классификация по всем наборам выполняется разом.
+    """
+    abc = ABCAnalyzer(Thresholds()).classify_codes_many(cum_share, thresholds_list)
+    xyz = XYZAnalyzer(Thresholds()).classify_codes_many(cv, thresholds_list)
 
-        df[StandardColumns.XYZ] = df[StandardColumns.CV].apply(classify)
-        return df
\ No newline at end of file
+    rows = []
+    for i, t in enumerate(thresholds_list):
+        row = t.model_dump()
+        for code, label in enumerate(ABCAnalyzer.labels):
+            row[f'n_{label}'] = int(np.count_nonzero(abc[i] == code))
+        for code, label in enumerate(XYZAnalyzer.labels):
+            row[f'n_{label}'] = int(np.count_nonzero(xyz[i] == code))
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from config.column_schema import StandardColumns, SourceColumns
 
@@ -8,9 +9,8 @@ class DataNormalizer:
     @staticmethod
     def normalize_sales(df: pd.DataFrame) -> pd.DataFrame:
         """Нормализует данные продаж к стандартному виду"""
-        df = df.copy()
-
         # Переименовываем колонки к стандартным названиям
+        # (rename возвращает новый DataFrame, отдельная копия не нужна)
         column_mapping = {
             SourceColumns.VIRUCHKA: StandardColumns.SUMMA
         }
@@ -21,8 +21,6 @@ class DataNormalizer:
     @staticmethod
     def normalize_stock(df: pd.DataFrame) -> pd.DataFrame:
         """Нормализует данные остатков к стандартному виду"""
-        df = df.copy()
-
         # Переименовываем колонки к стандартным названиям
         column_mapping = {
             SourceColumns.KOLICHESTVO: StandardColumns.OSTATOK
@@ -31,9 +29,31 @@ class DataNormalizer:
         df = df.rename(columns=column_mapping)
         return df
 
+    @staticmethod
+    def compact_dtypes(df: pd.DataFrame, categorical: list = (), floats: list = ()) -> pd.DataFrame:
+        """Уменьшает память: строки-повторы -> category, числа -> float32, если это без потерь.
+
+        Колонки изменяются на месте, df должен принадлежать вызывающему.
+        Категории сортируются, чтобы порядок кодов совпадал с порядком строк.
+        """
+        for col in categorical:
+            if col in df.columns:
+                values = df[col].astype('category')
+                df[col] = values.cat.reorder_categories(sorted(values.cat.categories))
+        for col in floats:
+            if col in df.columns:
+                values = df[col].to_numpy(dtype=np.float64)
+                compact = values.astype(np.float32)
+                # float32 хранит ~7 значащих цифр: берём его, только если значения не меняются
+                if np.array_equal(compact.astype(np.float64), values, equal_nan=True):
+                    df[col] = compact
+                else:
+                    df[col] = values
+        return df
+
     @staticmethod
     def validate_required_columns(df: pd.DataFrame, required_columns: list) -> None:
         """Проверяет наличие обязательных колонок"""
         missing = [col for col in required_columns if col not in df.columns]
         if missing:
-            raise ValueError(f"Отсутствуют обязательные колонки: {missing}")
\ No newline at end of file
+            raise ValueError(f"Отсутствуют обязательные колонки: {missing}")
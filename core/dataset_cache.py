@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (нужен только для Feather)
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+logger = logging.getLogger(__name__)
+
+# Увеличивать при изменении формата, который возвращают загрузчики и конвейер
+CACHE_VERSION = 7
+DEFAULT_CACHE_DIR = Path.home() / '.abc_xyz_cache'
+# Формат файлов write_frame: Feather (Arrow IPC) или pickle без pyarrow
+FRAME_SUFFIX = '.feather' if HAS_ARROW else '.pkl'
+# Файл разобранного отчёта: <sha1 содержимого>_<загрузчик>_v<версия>.<формат>
+# (файлы ResultCache в том же каталоге начинаются с префикса и сюда не попадают)
+SIDECAR_PATTERN = re.compile(r'^[0-9a-f]{40}_\w+_v(?P<version>\d+)\.(?:feather|pkl)$')
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Хэш содержимого файла (sha1), не зависит от имени и даты изменения"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """Сохраняет DataFrame в Feather (если есть pyarrow) или в pickle"""
+    if path.suffix == '.feather':
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_pickle(path)
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """Читает DataFrame, сохранённый write_frame"""
+    if path.suffix == '.feather':
+        return pd.read_feather(path)
+    return pd.read_pickle(path)
+
+
+class DatasetCache:
+    """Кэш разобранных файлов продаж и остатков.
+
+    В памяти ключ — (путь, mtime, размер): пока файл не менялся, он не
+    разбирается повторно. На диске рядом с хэшем содержимого хранится
+    готовый DataFrame, поэтому повторное открытие того же отчёта в другой
+    день обходится без разбора Excel. На диске хранится не больше
+    max_disk_entries файлов (лишние удаляются по дате последнего обращения,
+    как в LRUStore), файлы прежних версий CACHE_VERSION удаляются сразу.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR, max_disk_entries: int = 32):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_entries = max_disk_entries
+        self._memory: Dict[Tuple[str, str, int, int], pd.DataFrame] = {}
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    @staticmethod
+    def _stat_key(path: str) -> Tuple[str, int, int]:
+        st = os.stat(path)
+        return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+    def digest(self, path: str) -> str:
+        """Хэш содержимого файла; пересчитывается только после изменения файла"""
+        key = self._stat_key(path)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path)
+        return self._digests[key]
+
+    def _sidecar_path(self, digest: str, loader_name: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f'{digest}_{loader_name}_v{CACHE_VERSION}{FRAME_SUFFIX}'
+
+    def get(self, path: str, loader: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """Возвращает результат loader(path), разбирая файл только при его изменении.
+
+        Возвращаемый DataFrame общий для всех вызовов — не изменяйте его на месте.
+        """
+        df = self.lookup(path, loader)
+        if df is None:
+            df = loader(path)
+            self.put(path, loader, df)
+        return df
+
+    def lookup(self, path: str, loader: Callable[[str], pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """Результат loader(path) из памяти или с диска; None, если файл нужно разобрать"""
+        key = self._key(path, loader)
+        if key in self._memory:
+            return self._memory[key]
+
+        sidecar = self._sidecar_path(self.digest(path), key[0])
+        if sidecar is None or not sidecar.exists():
+            return None
+        try:
+            df = read_frame(sidecar)
+            os.utime(sidecar)
+        except Exception as e:
+            logger.warning('Не удалось прочитать кэш %s: %s', sidecar, e)
+            return None
+        self._remember(key, df)
+        return df
+
+    def put(self, path: str, loader: Callable[[str], pd.DataFrame], df: pd.DataFrame) -> None:
+        """Сохраняет разобранный файл в памяти и (если задан cache_dir) на диске"""
+        key = self._key(path, loader)
+        sidecar = self._sidecar_path(self.digest(path), key[0])
+        if sidecar is not None:
+            try:
+                sidecar.parent.mkdir(parents=True, exist_ok=True)
+                write_frame(df, sidecar)
+                self._prune_disk()
+            except Exception as e:
+                logger.warning('Не удалось сохранить кэш %s: %s', sidecar, e)
+        self._remember(key, df)
+
+    def _prune_disk(self) -> None:
+        current, stale = [], []
+        for path in self.cache_dir.iterdir():
+            match = SIDECAR_PATTERN.match(path.name)
+            if match:
+                (current if int(match['version']) == CACHE_VERSION else stale).append(path)
+        current.sort(key=lambda p: p.stat().st_mtime)
+        for path in stale + current[:-self.max_disk_entries]:
+            path.unlink(missing_ok=True)
+
+    def _key(self, path: str, loader) -> tuple:
+        return (getattr(loader, '__name__', 'loader'),) + self._stat_key(path)
+
+    def _remember(self, key: tuple, df: pd.DataFrame) -> None:
+        # Старые версии того же файла из памяти больше не нужны
+        for old in [k for k in self._memory if k[:2] == key[:2]]:
+            del self._memory[old]
+        self._memory[key] = df
+
+    def clear(self) -> None:
+        """Очищает кэш в памяти (файлы на диске не трогает)"""
+        self._memory.clear()
+        self._digests.clear()
@@ -0,0 +1,190 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+from core.instrumentation import ProgressCallback, stage
+from core.ranking import top_n
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # openpyxl нужен только для xlsx
+    Workbook = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow нужен только для Parquet
+    pa = pq = None
+
+EXPORT_FORMATS = ('.xlsx', '.csv', '.parquet')
+# Столько строк пишется за раз: память не растёт с размером результата
+DEFAULT_CHUNK_ROWS = 20_000
+
+RESULT_SHEET = 'Результат'
+CLASS_SHEET = 'Сводка по классам'
+WAREHOUSE_SHEET = 'По складам'
+TOP_SHEET = 'Топ по выручке'
+# Суффиксы файлов сводок для форматов без листов (CSV, Parquet)
+SHEET_FILE_SUFFIXES = {CLASS_SHEET: '_classes', WAREHOUSE_SHEET: '_warehouses', TOP_SHEET: '_top'}
+# Сколько позиций в сводке «Топ по выручке» (для каждого склада)
+TOP_POSITIONS = 50
+
+
+def class_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Число позиций, выручка, её доля и остатки по кодам ABC_XYZ (и складам, если есть)"""
+    keys = [StandardColumns.SKLAD, 'ABC_XYZ'] if StandardColumns.SKLAD in df.columns else ['ABC_XYZ']
+    summary = df.groupby(keys, observed=True).agg(
+        Позиций=(StandardColumns.ARTIKUL, 'size'),
+        Сумма=(StandardColumns.SUMMA, 'sum'),
+        Остаток=(StandardColumns.OSTATOK, 'sum'),
+    )
+    if len(keys) > 1:
+        total = summary[StandardColumns.SUMMA].groupby(level=0, observed=True).transform('sum')
+    else:
+        total = summary[StandardColumns.SUMMA].sum()
+    summary.insert(2, StandardColumns.DOLIA, summary[StandardColumns.SUMMA] / total)
+    return summary.reset_index()
+
+
+def warehouse_summary(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Матрица склады x коды ABC_XYZ; None, если в результате нет колонки Склад"""
+    if StandardColumns.SKLAD not in df.columns:
+        return None
+    return pd.crosstab(df[StandardColumns.SKLAD], df['ABC_XYZ']).reset_index()
+
+
+def top_summary(df: pd.DataFrame, n: int = TOP_POSITIONS) -> pd.DataFrame:
+    """n позиций с наибольшей выручкой (по каждому складу, если есть колонка Склад), по убыванию"""
+    revenue = df[StandardColumns.SUMMA].to_numpy(dtype=float)
+    if StandardColumns.SKLAD in df.columns:
+        groups = df.groupby(StandardColumns.SKLAD, observed=True, sort=False).indices.values()
+    else:
+        groups = [np.arange(len(df))]
+    # top_n выбирает лучших через argpartition, без сортировки всей группы
+    positions = np.concatenate([rows[top_n(revenue[rows], n)] for rows in groups] or [np.zeros(0, dtype=np.int64)])
+    return df.iloc[positions].reset_index(drop=True)
+
+
+def build_sheets(df: pd.DataFrame, summaries: bool = True) -> Dict[str, pd.DataFrame]:
+    """Листы выгрузки: полный результат и (по желанию) сводки"""
+    sheets = {RESULT_SHEET: df}
+    if summaries:
+        sheets[CLASS_SHEET] = class_summary(df)
+        by_warehouse = warehouse_summary(df)
+        if by_warehouse is not None:
+            sheets[WAREHOUSE_SHEET] = by_warehouse
+        sheets[TOP_SHEET] = top_summary(df)
+    return sheets
+
+
+def export_result(df: pd.DataFrame, path: str, summaries: bool = True,
+                  progress: ProgressCallback = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[str]:
+    """Сохраняет результат анализа; формат — по расширению path.
+
+    xlsx — одна книга с листами в режиме write_only; CSV и Parquet — файл
+    результата и рядом файлы сводок (<имя>_classes, <имя>_warehouses, <имя>_top).
+    Строки пишутся блоками по chunk_rows, после каждого блока вызывается
+    progress. Файл появляется под своим именем только после полной записи.
+    Возвращает список записанных путей.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(f'Неподдерживаемый формат выгрузки: {path.suffix}')
+
+    with stage(f'Выгрузка {suffix[1:]}', rows_in=len(df)):
+        sheets = build_sheets(df, summaries)
+        if suffix == '.xlsx':
+            _write_xlsx(sheets, path, progress, chunk_rows)
+            return [str(path)]
+
+        writer = _write_csv if suffix == '.csv' else _write_parquet
+        written = []
+        for name, sheet in sheets.items():
+            sheet_path = path if name == RESULT_SHEET else path.with_name(path.stem + SHEET_FILE_SUFFIXES[name] + suffix)
+            writer(sheet, sheet_path, _sheet_progress(progress, name), chunk_rows)
+            written.append(str(sheet_path))
+        return written
+
+
+def _chunks(df: pd.DataFrame, chunk_rows: int):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _sheet_progress(progress: ProgressCallback, name: str) -> Callable[[int, int], None]:
+    def report(done: int, total: int) -> None:
+        if progress is not None:
+            progress(f'Запись «{name}»: {done} из {total} строк')
+    return report
+
+
+@contextmanager
+def _replace_on_success(path: Path):
+    # Пишем во временный файл: прерванная выгрузка не оставит полуфайл
+    tmp = path.with_name(path.name + '.part')
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _write_csv(df: pd.DataFrame, path: Path, report, chunk_rows: int) -> None:
+    with _replace_on_success(path) as tmp, open(tmp, 'w', encoding='utf-8-sig', newline='') as f:
+        df.iloc[:0].to_csv(f, index=False, sep=';')
+        done = 0
+        for chunk in _chunks(df, chunk_rows):
+            chunk.to_csv(f, index=False, header=False, sep=';')
+            done += len(chunk)
+            report(done, len(df))
+
+
+def _write_parquet(df: pd.DataFrame, path: Path, report, chunk_rows: int) -> None:
+    if pq is None:
+        raise ImportError('Для выгрузки в Parquet установите pyarrow')
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with _replace_on_success(path) as tmp, pq.ParquetWriter(tmp, schema) as writer:
+        done = 0
+        for chunk in _chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            done += len(chunk)
+            report(done, len(df))
+
+
+def _write_xlsx(sheets: Dict[str, pd.DataFrame], path: Path, progress: ProgressCallback, chunk_rows: int) -> None:
+    if Workbook is None:
+        raise ImportError('Для выгрузки в Excel установите openpyxl')
+    # write_only: строки сразу уходят в файл, книга целиком в памяти не строится
+    workbook = Workbook(write_only=True)
+    for name, df in sheets.items():
+        report = _sheet_progress(progress, name)
+        sheet = workbook.create_sheet(title=name)
+        sheet.append([str(col) for col in df.columns])
+        done = 0
+        for chunk in _chunks(df, chunk_rows):
+            for row in _python_rows(chunk):
+                sheet.append(row)
+            done += len(chunk)
+            report(done, len(df))
+    with _replace_on_success(path) as tmp:
+        workbook.save(tmp)
+
+
+def _python_rows(chunk: pd.DataFrame):
+    # Пустые значения -> пустые ячейки; числа numpy -> числа Python
+    columns = []
+    for col in chunk.columns:
+        values = chunk[col].to_numpy(dtype=object, copy=True)  # может быть только для чтения (Arrow)
+        values[pd.isna(values)] = None
+        if chunk[col].dtype.kind == 'f':
+            values = [None if v is None else float(v) for v in values]
+        elif chunk[col].dtype.kind in 'iu':
+            values = [int(v) for v in values]
+        columns.append(values)
+    return zip(*columns)
@@ -1,10 +1,24 @@
+import logging
+
+import numpy as np
 import pandas as pd
 from core.data_normalizer import DataNormalizer
 from config.column_schema import StandardColumns
+from core.instrumentation import stage
+from core.numeric_parser import parse_numbers
+from core.stock_index import StockIndex
+
+logger = logging.getLogger(__name__)
 
 
 def load_stock(path: str) -> pd.DataFrame:
-    df = pd.read_excel(path, header=4)
+    """Остатки по одной строке на артикул (на склад и артикул, если в файле есть колонка Склад).
+
+    Повторяющиеся строки (партии, склады) складываются — см. StockIndex.
+    """
+    with stage('Чтение Excel (остатки)') as st:
+        df = pd.read_excel(path, header=4)
+        st.rows_out = len(df)
 
     # Проверяем исходные колонки
     required = ['Артикул', 'Номенклатура', 'Количество']
@@ -12,11 +26,31 @@ def load_stock(path: str) -> pd.DataFrame:
         if col not in df.columns:
             raise ValueError(f"[STOCK] Ожидаются колонки: {required}")
 
-    # Обрабатываем данные
-    df['Артикул'] = df['Артикул'].astype(str).str.strip().str.lower()
-    df['Количество'] = pd.to_numeric(df['Количество'], errors='coerce').fillna(0)
+    with stage('Нормализация остатков', rows_in=len(df)) as st:
+        # Обрабатываем данные
+        df['Артикул'] = df['Артикул'].astype(str).str.strip().str.lower()
+        # «1 234,50» с неразрывным пробелом — тоже число, а не 0
+        parsed = parse_numbers(df['Количество'])
+        if parsed.failed_count:
+            logger.warning('Остатки, колонка Количество: %s', parsed.describe())
+        df['Количество'] = np.nan_to_num(parsed.values, nan=0.0)
+
+        # Нормализуем к стандартным названиям
+        df = DataNormalizer.normalize_stock(df)
 
-    # Нормализуем к стандартным названиям
-    df = DataNormalizer.normalize_stock(df)
+        columns = [StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA, StandardColumns.OSTATOK]
+        if StandardColumns.SKLAD in df.columns:
+            df[StandardColumns.SKLAD] = df[StandardColumns.SKLAD].fillna('').astype(str).str.strip()
+            columns.insert(0, StandardColumns.SKLAD)
 
-    return df[[StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA, StandardColumns.OSTATOK]]
\ No newline at end of file
+        index = StockIndex(df[columns])
+        if index.duplicates:
+            logger.info('Остатки: сложено повторяющихся строк: %d', index.duplicates)
+        df = index.frame()
+        df = DataNormalizer.compact_dtypes(
+            df,
+            categorical=[StandardColumns.SKLAD, StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA],
+            floats=[StandardColumns.OSTATOK],
+        )
+        st.rows_out = len(df)
+    return df
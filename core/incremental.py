@@ -0,0 +1,191 @@
+import bisect
+import pickle
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+from core.aggregation import aggregate_sales, fill_empty_months, period_span
+
+_KEYS = [StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA]
+
+
+class IncrementalAnalysis:
+    """Состояние для инкрементального пересчёта ABC/XYZ по месяцам.
+
+    Хранит по каждой позиции итог выручки, бегущую статистику помесячной
+    выручки по Уэлфорду (count, mean, M2) и выручку по месяцам окна (она
+    нужна, чтобы исключить старый месяц из окна). Поэтому добавление
+    нового месяца и удаление самого старого стоят O(число позиций) и не
+    требуют повторного разбора и агрегации всей истории.
+
+    abc_frame()/monthly_stats() совместимы с SalesAggregates, результат
+    передаётся в AnalysisPipeline.classify.
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window  # Сколько последних месяцев учитывать (None — все)
+        self.skus = pd.DataFrame({key: pd.Series(dtype=object) for key in _KEYS})
+        self.months: List[int] = []              # Коды периодов окна по возрастанию
+        self.revenue = np.zeros((0, 0))          # (позиции x месяцы окна)
+        self.present = np.zeros((0, 0), dtype=bool)
+        self.total = np.zeros(0)                 # Выручка за месяцы окна
+        self.undated = np.zeros(0)               # Выручка строк без месяца
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    # --- обновление состояния ---
+
+    def add_sales(self, sales: pd.DataFrame) -> None:
+        """Добавляет строки продаж за новые месяцы.
+
+        Месяц, который уже есть в окне, заменяется (например, исправленной выгрузкой).
+        Месяцы хранятся в порядке периодов, а не добавления: выгрузку за
+        пропущенный месяц можно добавить позже, и окно отбросит именно самые старые.
+        """
+        aggregates = aggregate_sales(sales)
+        rows = self._align_skus(aggregates.skus)
+
+        self.undated[rows] += aggregates.totals - aggregates.revenue.sum(axis=1)
+
+        for j, month in enumerate(aggregates.months):
+            month = int(month)
+            if month in self.months:
+                self._remove_month(self.months.index(month))
+            column = np.zeros(len(self))
+            present = np.zeros(len(self), dtype=bool)
+            column[rows] = aggregates.revenue[:, j]
+            present[rows] = aggregates.present[:, j]
+            self._insert_month(month, column, present)
+
+        if self.window is not None:
+            while len(self.months) > self.window:
+                self.drop_oldest()
+        # Заменённый месяц мог быть единственным для части позиций
+        self._prune()
+
+    def drop_oldest(self) -> None:
+        """Убирает из окна самый старый месяц и позиции, у которых не осталось продаж"""
+        if self.months:
+            self._remove_month(0)
+            self._prune()
+
+    def _prune(self) -> None:
+        # Позиция без продаж в окне и без строк без месяца не должна попадать
+        # в результат с нулевой выручкой и классом C
+        keep = (self.count > 0) | (self.undated != 0)
+        if keep.all():
+            return
+        self.skus = self.skus[keep].reset_index(drop=True)
+        self.revenue = self.revenue[keep]
+        self.present = self.present[keep]
+        self.total = self.total[keep]
+        self.undated = self.undated[keep]
+        self.count = self.count[keep]
+        self.mean = self.mean[keep]
+        self.m2 = self.m2[keep]
+
+    def _align_skus(self, skus: pd.DataFrame) -> np.ndarray:
+        """Номера строк состояния для позиций skus; новые позиции добавляются в конец"""
+        skus = skus.astype(str).reset_index(drop=True)
+        existing = pd.MultiIndex.from_frame(self.skus.astype(str))
+        rows = existing.get_indexer(pd.MultiIndex.from_frame(skus))
+
+        new = rows < 0
+        if new.any():
+            rows[new] = len(self) + np.arange(new.sum())
+            self.skus = pd.concat([self.skus, skus[new]], ignore_index=True)
+            extra = int(new.sum())
+            self.revenue = np.vstack([self.revenue, np.zeros((extra, len(self.months)))])
+            self.present = np.vstack([self.present, np.zeros((extra, len(self.months)), dtype=bool)])
+            self.total = np.concatenate([self.total, np.zeros(extra)])
+            self.undated = np.concatenate([self.undated, np.zeros(extra)])
+            self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+            self.mean = np.concatenate([self.mean, np.zeros(extra)])
+            self.m2 = np.concatenate([self.m2, np.zeros(extra)])
+        return rows
+
+    def _insert_month(self, month: int, column: np.ndarray, present: np.ndarray) -> None:
+        # Шаг Уэлфорда только для позиций, у которых в этом месяце были продажи
+        x = column[present]
+        count = self.count[present] + 1
+        delta = x - self.mean[present]
+        mean = self.mean[present] + delta / count
+        self.m2[present] += delta * (x - mean)
+        self.mean[present] = mean
+        self.count[present] = count
+        self.total += column
+
+        j = bisect.bisect(self.months, month)
+        self.months.insert(j, month)
+        self.revenue = np.insert(self.revenue, j, column, axis=1)
+        self.present = np.insert(self.present, j, present, axis=1)
+
+    def _remove_month(self, j: int) -> None:
+        # Обратный шаг Уэлфорда: исключаем значение месяца из статистики
+        present = self.present[:, j]
+        x = self.revenue[present, j]
+        count = self.count[present]
+        mean = self.mean[present]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_rest = np.where(count > 1, (count * mean - x) / (count - 1), 0.0)
+        m2 = np.where(count > 1, self.m2[present] - (x - mean_rest) * (x - mean), 0.0)
+
+        self.m2[present] = np.maximum(m2, 0.0)
+        self.mean[present] = mean_rest
+        self.count[present] = count - 1
+        self.total -= self.revenue[:, j]
+
+        del self.months[j]
+        self.revenue = np.delete(self.revenue, j, axis=1)
+        self.present = np.delete(self.present, j, axis=1)
+
+    # --- вход классификации ---
+
+    def _order(self) -> np.ndarray:
+        # Порядок позиций как у groupby/aggregate_sales: по артикулу, затем по названию
+        keys = self.skus.astype(str)
+        return np.lexsort((keys[StandardColumns.NOMENCLATURA].to_numpy(), keys[StandardColumns.ARTIKUL].to_numpy()))
+
+    def abc_frame(self) -> pd.DataFrame:
+        order = self._order()
+        df = self.skus.iloc[order].reset_index(drop=True)
+        df[StandardColumns.SUMMA] = (self.total + self.undated)[order]
+        return df
+
+    def monthly_stats(self, include_empty: bool = False) -> pd.DataFrame:
+        order = self._order()
+        count = self.count[order]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(self.m2[order] / (count - 1))
+        std[count < 2] = np.nan
+        mean = np.where(count > 0, self.mean[order], np.nan)
+        if include_empty:
+            mean, std, count = fill_empty_months(mean, std, count, period_span(self.months))
+
+        df = self.skus.iloc[order].reset_index(drop=True)
+        df['mean'] = mean
+        df['std'] = std
+        df['count'] = count
+        return df
+
+    # --- сохранение между запусками ---
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalAnalysis':
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if not isinstance(state, cls):
+            raise ValueError(f'{path}: это не файл состояния инкрементального анализа')
+        if any(not isinstance(month, (int, np.integer)) for month in state.months):
+            # Состояние старой версии: месяцы — строки-заголовки, а не коды периодов
+            raise ValueError(f'{path}: состояние устаревшего формата, создайте его заново')
+        return state
@@ -0,0 +1,240 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, List, Optional
+
+try:
+    import psutil
+except ImportError:  # без psutil RSS читается из /proc (Linux)
+    psutil = None
+
+logger = logging.getLogger('abc_xyz.stages')
+
+DEFAULT_LOG_DIR = Path.home() / '.abc_xyz_logs'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# Профилирование cProfile включается переменной окружения или флагом --profile
+PROFILE_ENV = 'ABC_XYZ_PROFILE'
+# Обратный вызов прогресса: получает название текущего этапа
+ProgressCallback = Optional[Callable[[str], None]]
+
+_local = threading.local()
+_profiling = os.environ.get(PROFILE_ENV, '').strip().lower() not in ('', '0', 'false', 'no')
+_profile_dir = DEFAULT_LOG_DIR
+
+
+def current_rss_mb() -> float:
+    """Текущий RSS процесса в МБ (0, если узнать нельзя)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2 ** 20
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+@dataclass
+class StageRecord:
+    """Замер одного этапа; время и память — без вложенных этапов"""
+
+    name: str
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    memory_mb: float = 0.0
+    calls: int = 0
+
+    def describe(self) -> str:
+        rows = ''
+        if self.rows_in is not None or self.rows_out is not None:
+            rows = f', строк {self.rows_in if self.rows_in is not None else "-"}' \
+                   f' -> {self.rows_out if self.rows_out is not None else "-"}'
+        calls = f', вызовов {self.calls}' if self.calls > 1 else ''
+        return f'{self.name}: {self.seconds:.3f} с, память {self.memory_mb:+.1f} МБ{rows}{calls}'
+
+
+class StageLog:
+    """Журнал этапов одного расчёта.
+
+    Активируется в потоке через with; пока он активен, stage() в любом
+    модуле этого потока пишет в него. Повторные этапы с тем же именем
+    (например, разбор каждого блока листа) суммируются в одну запись.
+    """
+
+    def __init__(self, title: str = ''):
+        self.title = title
+        self.records: List[StageRecord] = []
+        self._by_name = {}
+
+    def __enter__(self) -> 'StageLog':
+        _stack().append(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _stack().remove(self)
+
+    def record(self, name: str) -> StageRecord:
+        if name not in self._by_name:
+            self._by_name[name] = StageRecord(name)
+            self.records.append(self._by_name[name])
+        return self._by_name[name]
+
+    def merge(self, records: List[StageRecord]) -> None:
+        """Добавляет записи другого журнала (например, из дочернего процесса)"""
+        for r in records:
+            record = self.record(r.name)
+            record.seconds += r.seconds
+            record.memory_mb += r.memory_mb
+            record.calls += r.calls
+            if r.rows_in is not None:
+                record.rows_in = (record.rows_in or 0) + r.rows_in
+            if r.rows_out is not None:
+                record.rows_out = (record.rows_out or 0) + r.rows_out
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(r.seconds for r in self.records)
+
+    def slowest(self) -> Optional[StageRecord]:
+        return max(self.records, key=lambda r: r.seconds, default=None)
+
+    def summary(self) -> str:
+        """Короткая строка для статусной строки окна"""
+        slowest = self.slowest()
+        if slowest is None:
+            return ''
+        return f'{self.total_seconds:.2f} с, дольше всего «{slowest.name}» {slowest.seconds:.2f} с'
+
+    def write(self, log: logging.Logger = logger) -> None:
+        log.info('Этапы%s: всего %.3f с', f' ({self.title})' if self.title else '', self.total_seconds)
+        for r in self.records:
+            log.info('  %s', r.describe())
+
+
+class _Frame:
+    # Открытый этап: вложенные этапы добавляют сюда своё время и память,
+    # тело этапа задаёт rows_out
+    __slots__ = ('child_seconds', 'child_memory', 'rows_out')
+
+    def __init__(self):
+        self.child_seconds = 0.0
+        self.child_memory = 0.0
+        self.rows_out = None
+
+
+def active_log() -> Optional[StageLog]:
+    """Активный журнал этапов текущего потока (None, если его нет)"""
+    logs = _stack()
+    return logs[-1] if logs else None
+
+
+def _stack() -> list:
+    if not hasattr(_local, 'logs'):
+        _local.logs = []
+        _local.frames = []
+    return _local.logs
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None):
+    """Замеряет этап: время, строки на входе/выходе, изменение RSS.
+
+    with stage('ABC-анализ', rows_in=len(df)) as st: ...; st.rows_out = len(result)
+
+    Без активного StageLog в потоке этап только пишется в журнал на уровне DEBUG.
+    """
+    logs = _stack()
+    frames = _local.frames
+    frame = _Frame()
+    frames.append(frame)
+    memory_before = current_rss_mb()
+    start = time.perf_counter()
+    try:
+        yield frame
+    finally:
+        elapsed = time.perf_counter() - start
+        memory = current_rss_mb() - memory_before
+        frames.pop()
+        if frames:
+            frames[-1].child_seconds += elapsed
+            frames[-1].child_memory += memory
+
+        seconds = elapsed - frame.child_seconds
+        memory -= frame.child_memory
+        if logs:
+            record = logs[-1].record(name)
+            record.seconds += seconds
+            record.memory_mb += memory
+            record.calls += 1
+            if rows_in is not None:
+                record.rows_in = (record.rows_in or 0) + rows_in
+            if frame.rows_out is not None:
+                record.rows_out = (record.rows_out or 0) + frame.rows_out
+        logger.debug('%s: %.3f с, строк %s -> %s', name, seconds, rows_in, frame.rows_out)
+
+
+# --- профилирование ---
+
+def set_profiling(enabled: bool, profile_dir: Optional[Path] = None) -> None:
+    """Включает профилирование; профили сохраняются в profile_dir (по умолчанию — каталог журнала)"""
+    global _profiling, _profile_dir
+    _profiling = enabled
+    if profile_dir is not None:
+        _profile_dir = Path(profile_dir)
+
+
+def profiling_enabled() -> bool:
+    return _profiling
+
+
+@contextmanager
+def profiled(name: str, top: int = 20):
+    """Если профилирование включено, снимает cProfile с тела блока.
+
+    Статистика сохраняется в <каталог профилей>/<name>-<время>.prof (смотреть через
+    snakeviz или pstats), самые дорогие функции пишутся в журнал.
+    Профилируется только текущий поток.
+    """
+    if not _profiling:
+        yield
+        return
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        path = _profile_dir / f'{name}-{datetime.now():%Y%m%d-%H%M%S}.prof'
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(path))
+        except OSError as e:
+            logger.warning('Не удалось сохранить профиль %s: %s', path, e)
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(top)
+        logger.info('Профиль %s (%s):\n%s', name, path, out.getvalue())
+
+
+# --- журнал ---
+
+def setup_logging(log_file: Optional[Path] = DEFAULT_LOG_DIR / 'abc_xyz.log', level: int = logging.INFO) -> None:
+    """Журнал в консоль и (если задан log_file) в файл с ротацией"""
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file is not None:
+        try:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(RotatingFileHandler(log_file, maxBytes=2 ** 20, backupCount=3, encoding='utf-8'))
+        except OSError as e:
+            print(f'Журнал в файл недоступен: {e}', file=sys.stderr)
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
@@ -1,50 +1,180 @@
+import itertools
+import logging
+from pathlib import Path
+from typing import Iterable, Iterator, List, Union
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from config.column_schema import StandardColumns
 from core.data_normalizer import DataNormalizer
+from core.instrumentation import stage
+from core.numeric_parser import parse_numbers
+from core.periods import PERIOD_DTYPE, parse_periods
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+# Потоковое чтение: строк листа в одном блоке и форматы, которые его поддерживают
+DEFAULT_CHUNK_ROWS = 100_000
+STREAMING_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+def _parse_number_column(col: pd.Series, label: str = '') -> pd.Series:
+    """Разбирает колонку чисел (см. parse_numbers); нераспознанный текст — 0, пустая ячейка — NaN"""
+    parsed = parse_numbers(col)
+    if parsed.failed_count:
+        logger.warning('Продажи, колонка %s: %s', label or col.name, parsed.describe())
+    values = np.where(parsed.failed, 0.0, parsed.values)
+    return pd.Series(values, index=col.index, name=col.name)
+
+
+def _parse_rows(raw: pd.DataFrame, sklad=None, month=None):
+    """Разбирает блок строк листа с учётом склада и месяца, действующих на его начало.
+
+    Возвращает (строки продаж, склад и месяц на конец блока).
+    """
+    with stage('Разбор строк', rows_in=len(raw)) as st:
+        result, sklad, month = _split_rows(raw, sklad, month)
+        st.rows_out = len(result)
+
+    with stage('Нормализация', rows_in=len(result)) as st:
+        # Названия повторяются для каждого месяца и склада — храним их категориями
+        result = DataNormalizer.compact_dtypes(
+            result,
+            categorical=[StandardColumns.SKLAD, StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA],
+            floats=["Количество", "Выручка"],
+        )
+        result = DataNormalizer.normalize_sales(result)
+        st.rows_out = len(result)
+    return result, sklad, month
+
+
+def _split_rows(raw: pd.DataFrame, sklad, month):
+    """Классифицирует строки блока и собирает строки продаж (типы ещё не приведены)"""
+    raw = raw.reindex(columns=range(3))
+    cell = raw[0].fillna('').astype(str).str.strip()
+    lower = cell.str.lower()
+
+    # Классифицируем все строки разом: приоритет склад -> месяц -> позиция.
+    # Заголовок месяца распознаётся целиком (см. core.periods); в строках
+    # позиций есть запятая, поэтому их регулярным выражением не проверяем
+    is_sklad = lower.str.contains('склад', regex=False)
+    has_comma = cell.str.contains(',', regex=False)
+    periods = pd.Series(pd.NA, index=cell.index, dtype=PERIOD_DTYPE)
+    candidates = ~is_sklad & ~has_comma
+    if candidates.any():
+        periods[candidates] = parse_periods(cell[candidates])
+    is_month = periods.notna()
+    is_item = ~is_sklad & ~is_month & has_comma
+
+    # Протягиваем контекст склада и месяца (код периода) вниз до следующего заголовка
+    sklad_headers = cell.where(is_sklad)
+    sklad_values = sklad_headers.ffill().fillna(sklad) if sklad is not None else sklad_headers.ffill()
+    month_values = periods.ffill().fillna(month) if month is not None else periods.ffill()
+    undated = is_item & month_values.isna()
+    if undated.any():
+        # Без месяца у строк не будет XYZ — показываем, какие заголовки не распознаны
+        other = cell[~is_sklad & ~is_month & ~is_item & (cell != '')]
+        samples = ', '.join(repr(text) for text in other.unique()[:3]) or 'нет'
+        logger.warning('Продажи: строк без распознанного месяца: %d (XYZ для них не считается); '
+                       'заголовки, не распознанные как месяц: %s', int(undated.sum()), samples)
+    if is_sklad.any():
+        sklad = sklad_headers[is_sklad].iloc[-1]
+    if is_month.any():
+        month = int(periods[is_month].iloc[-1])
+
+    parts = cell[is_item].str.partition(',')
+    if parts.empty:
+        parts = pd.DataFrame({0: cell[is_item], 2: cell[is_item]})
+
+    result = pd.DataFrame({
+        StandardColumns.SKLAD: sklad_values[is_item],
+        StandardColumns.MESYAC: month_values[is_item],
+        StandardColumns.ARTIKUL: parts[0].str.strip().str.lower(),
+        StandardColumns.NOMENCLATURA: parts[2].str.strip(),
+        "Количество": _parse_number_column(raw.loc[is_item, 1], "Количество"),
+        "Выручка": _parse_number_column(raw.loc[is_item, 2], "Выручка"),  # Это будет переименовано в normalize_sales
+    }).reset_index(drop=True)
+    return result, sklad, month
+
+
+def parse_sales_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """Разбирает иерархический отчёт продаж (склад -> месяц -> позиции) целиком, без цикла по строкам"""
+    result, _, _ = _parse_rows(raw.iloc[1:])
+    return result
+
+
+def sales_sheet_names(path: str) -> List[str]:
+    """Имена листов книги продаж в порядке следования"""
+    if openpyxl is not None and Path(path).suffix.lower() in STREAMING_SUFFIXES:
+        wb = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+    with pd.ExcelFile(path) as book:
+        return [str(name) for name in book.sheet_names]
+
+
+def iter_sales_chunks(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      sheet: Union[int, str] = 0) -> Iterator[pd.DataFrame]:
+    """Потоково читает лист продаж (номер или имя) блоками по chunk_rows строк.
+
+    Книга открывается в режиме только для чтения, строки листа не
+    накапливаются целиком: память зависит от размера блока, а не файла.
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        # Первая строка листа — заголовок отчёта, как и в parse_sales_frame
+        ws = wb.worksheets[sheet] if isinstance(sheet, int) else wb[sheet]
+        rows = ws.iter_rows(min_row=2, max_col=3, values_only=True)
+        sklad = month = None
+        while True:
+            with stage('Чтение Excel') as st:
+                block = pd.DataFrame(list(itertools.islice(rows, chunk_rows)))
+                st.rows_out = len(block)
+            if block.empty:
+                break
+            chunk, sklad, month = _parse_rows(block, sklad, month)
+            if len(chunk):
+                yield chunk
+    finally:
+        wb.close()
+
+
+def concat_sales_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Склеивает блоки продаж, объединяя категории, а не переводя их в строки"""
+    chunks = list(chunks)
+    if not chunks:
+        return parse_sales_frame(pd.DataFrame())
+    if len(chunks) == 1:
+        return chunks[0]
+
+    with stage('Склейка блоков', rows_in=sum(len(chunk) for chunk in chunks)) as st:
+        columns = {}
+        for col in chunks[0].columns:
+            parts = [chunk[col] for chunk in chunks]
+            if isinstance(parts[0].dtype, pd.CategoricalDtype):
+                columns[col] = union_categoricals(parts, sort_categories=True)
+            else:
+                columns[col] = pd.concat(parts, ignore_index=True)
+        df = pd.DataFrame(columns)
+        st.rows_out = len(df)
+    return df
+
+
+def load_sales_detailed(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                        sheet: Union[int, str] = 0) -> pd.DataFrame:
+    if openpyxl is not None and Path(path).suffix.lower() in STREAMING_SUFFIXES:
+        return concat_sales_chunks(iter_sales_chunks(path, chunk_rows, sheet))
 
-def load_sales_detailed(path: str) -> pd.DataFrame:
-    df = pd.read_excel(path, header=None)
-
-    records = []
-    current_sklad = None
-    current_month = None
-
-    for i in range(1, len(df)):
-        row = df.iloc[i]
-        cell = str(row[0]).strip()
-
-        if 'склад' in cell.lower():
-            current_sklad = cell
-            continue
-
-        if any(m in cell.lower() for m in ('янв', 'фев', 'мар', 'апр', 'май', 'июн', 'июл', 'авг', 'сен', 'окт', 'ноя', 'дек')):
-            current_month = cell
-            continue
-
-        if ',' in cell:
-            parts = cell.split(',', 1)
-            artikul = parts[0].strip().lower()
-            name = parts[1].strip()
-
-            try:
-                qty = float(str(row[1]).replace(" ", "").replace(",", "."))
-            except:
-                qty = 0
-
-            try:
-                revenue = float(str(row[2]).replace(" ", "").replace(",", "."))
-            except:
-                revenue = 0
-
-            records.append({
-                "Склад": current_sklad,
-                "Месяц": current_month,
-                StandardColumns.ARTIKUL: artikul,
-                StandardColumns.NOMENCLATURA: name,
-                "Количество": qty,
-                "Выручка": revenue,  # Это будет переименовано в normalize_sales
-            })
-
-    df = pd.DataFrame(records)
-    df = DataNormalizer.normalize_sales(df)
-    return df
\ No newline at end of file
+    # Прочие форматы (например, .xls) читаются целиком
+    with stage('Чтение Excel') as st:
+        df = pd.read_excel(path, header=None, sheet_name=sheet)
+        st.rows_out = len(df)
+    return parse_sales_frame(df)
@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Разделители разрядов: пробел, неразрывный, узкий неразрывный и тонкий пробелы
+THOUSANDS_SEPARATORS = '\u0020\u00a0\u202f\u2009'
+# Сколько нераспознанных значений показывать в примере
+DEFAULT_SAMPLES = 5
+
+_SPACES = '[' + THOUSANDS_SEPARATORS + ']'
+
+
+@dataclass
+class ParsedNumbers:
+    """Результат parse_numbers: числа (NaN — пусто или не распознано) и нераспознанные ячейки"""
+
+    values: np.ndarray
+    failed: np.ndarray  # Маска ячеек с текстом, который не удалось разобрать
+    samples: List[str] = field(default_factory=list)
+
+    @property
+    def failed_count(self) -> int:
+        return int(self.failed.sum())
+
+    def describe(self) -> str:
+        """Строка для журнала: сколько значений не распознано и примеры"""
+        return f'не распознано значений: {self.failed_count}, например: ' + ', '.join(repr(s) for s in self.samples)
+
+
+def _normalize_text(text: pd.Series) -> pd.Series:
+    """Приводит запись числа в «русском» формате к виду, который понимает to_numeric"""
+    text = text.str.replace(_SPACES, '', regex=True)
+    # (123,45) — отрицательное число в бухгалтерской записи
+    negative = text.str.startswith('(') & text.str.endswith(')')
+    if negative.any():
+        text = text.mask(negative, '-' + text.str.slice(1, -1))
+
+    # Если есть и точка, и запятая, десятичный разделитель — тот, что правее
+    both = text.str.contains(',', regex=False) & text.str.contains('.', regex=False)
+    if both.any():
+        comma_last = text.str.rfind(',') > text.str.rfind('.')
+        text = text.mask(both & comma_last, text.str.replace('.', '', regex=False))
+        text = text.mask(both & ~comma_last, text.str.replace(',', '', regex=False))
+    return text.str.replace(',', '.', regex=False)
+
+
+def parse_numbers(values, max_samples: int = DEFAULT_SAMPLES) -> ParsedNumbers:
+    """Разбирает колонку чисел целиком: числа из Excel и текст вида «1 234,50» или «(12,5)».
+
+    Пробелы всех видов между разрядами убираются, десятичная запятая
+    заменяется точкой. Пустые ячейки дают NaN без ошибки; текст, который
+    не удалось разобрать, — NaN и отметку в failed.
+    """
+    col = values.reset_index(drop=True) if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        return ParsedNumbers(col.to_numpy(dtype=float), np.zeros(len(col), dtype=bool))
+
+    # Ячейки с числами разбирает to_numeric, текст — только строковые ячейки
+    cells = col.to_numpy(dtype=object)
+    is_text = np.fromiter((type(v) is str for v in cells), dtype=bool, count=len(cells))
+    result = np.full(len(col), np.nan)
+    if not is_text.all():
+        result[~is_text] = pd.to_numeric(col[~is_text], errors='coerce')
+    # Например, дата вместо числа
+    failed = ~is_text & col.notna().to_numpy() & np.isnan(result)
+
+    text = col[is_text].astype(str)
+    # Пустые строки — не ошибка, а пустая ячейка
+    text = text[text.str.strip() != '']
+    if len(text):
+        parsed = pd.to_numeric(_normalize_text(text), errors='coerce').to_numpy(dtype=float)
+        result[text.index] = parsed
+        failed[text.index[np.isnan(parsed)]] = True
+
+    samples = col[failed].astype(str).unique()[:max_samples].tolist() if failed.any() else []
+    return ParsedNumbers(result, failed, samples)
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+from core.dataset_cache import FRAME_SUFFIX, DatasetCache, read_frame, write_frame
+from core.file_loader import load_stock
+from core.instrumentation import ProgressCallback, StageLog, active_log, stage
+from core.load_sales_detailed import concat_sales_chunks, load_sales_detailed, sales_sheet_names
+
+# Задача загрузки: (загрузчик, путь, именованные аргументы загрузчика)
+LoadTask = Tuple[Callable[..., pd.DataFrame], str, dict]
+
+
+def _load_to_file(loader, path: str, kwargs: dict, out_path: str):
+    """Выполняется в дочернем процессе: разбирает файл и пишет DataFrame в out_path.
+
+    Большие таблицы не передаются через pickle: родитель читает файл
+    (Feather — формат Arrow IPC), а в ответ уходят только путь и замеры этапов.
+    """
+    with StageLog() as log:
+        df = loader(path, **kwargs)
+        with stage('Передача данных', rows_in=len(df)):
+            write_frame(df, Path(out_path))
+    return out_path, log.records
+
+
+def load_frames(tasks: Sequence[LoadTask], jobs: Optional[int] = None,
+                progress: ProgressCallback = None) -> List[pd.DataFrame]:
+    """Выполняет задачи загрузки в пуле процессов; результаты — в порядке задач.
+
+    Одна задача (или jobs=1) выполняется в текущем процессе. Замеры этапов
+    дочерних процессов добавляются в активный StageLog; их время — сумма
+    по процессам, а не время ожидания.
+    """
+    n_workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    if n_workers <= 1:
+        return [loader(path, **kwargs) for loader, path, kwargs in tasks]
+
+    tmp_dir = tempfile.mkdtemp(prefix='abc_xyz_load_')
+    pool = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        futures = {
+            pool.submit(_load_to_file, loader, path, kwargs, os.path.join(tmp_dir, f'{i}{FRAME_SUFFIX}')): i
+            for i, (loader, path, kwargs) in enumerate(tasks)
+        }
+        outputs = [None] * len(tasks)
+        for done, future in enumerate(as_completed(futures), 1):
+            outputs[futures[future]] = future.result()
+            if progress is not None:
+                progress(f'Загрузка файлов: {done} из {len(tasks)}')
+
+        log = active_log()
+        frames = []
+        for out_path, records in outputs:
+            if log is not None:
+                log.merge(records)
+            with stage('Передача данных') as st:
+                frames.append(read_frame(Path(out_path)))
+                st.rows_out = len(frames[-1])
+        return frames
+    finally:
+        # При отмене не ждём уже запущенные разборы
+        pool.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def sales_tasks(paths: Union[str, Sequence[str]], all_sheets: bool = False) -> List[LoadTask]:
+    """Задачи разбора продаж: первый лист каждого файла или (all_sheets) все листы"""
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    if not all_sheets:
+        return [(load_sales_detailed, path, {}) for path in paths]
+    return [(load_sales_detailed, path, {'sheet': name}) for path in paths for name in sales_sheet_names(path)]
+
+
+def concat_sales(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Склеивает продажи нескольких листов и файлов (пустые листы пропускаются)"""
+    return concat_sales_chunks(df for df in frames if len(df))
+
+
+def load_inputs(sales_paths: Union[str, Sequence[str]], stock_path: str, jobs: Optional[int] = None,
+                all_sheets: bool = False, progress: ProgressCallback = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Продажи (все файлы и листы — одним DataFrame) и остатки, разобранные параллельно"""
+    frames = load_frames(sales_tasks(sales_paths, all_sheets) + [(load_stock, stock_path, {})], jobs, progress)
+    return concat_sales(frames[:-1]), frames[-1]
+
+
+def load_cached(cache: DatasetCache, requests: Sequence[Tuple[str, Callable[[str], pd.DataFrame]]],
+                jobs: Optional[int] = None, progress: ProgressCallback = None) -> List[pd.DataFrame]:
+    """Как DatasetCache.get для нескольких файлов: файлы не из кэша разбираются параллельно"""
+    frames = [cache.lookup(path, loader) for path, loader in requests]
+    missing = [i for i, df in enumerate(frames) if df is None]
+    loaded = load_frames([(requests[i][1], requests[i][0], {}) for i in missing], jobs, progress)
+    for i, df in zip(missing, loaded):
+        path, loader = requests[i]
+        cache.put(path, loader, df)
+        frames[i] = df
+    return frames
@@ -0,0 +1,57 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+MONTH_NAMES = [
+    'Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь',
+    'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь',
+]
+
+# Месяц хранится целым кодом периода: год * 12 + (месяц - 1); пусто — NA.
+# Заголовок без года («Январь») даёт код года 0, то есть 0..11: месяцы
+# такого отчёта упорядочены внутри года, но не различают годы.
+PERIOD_DTYPE = 'Int32'
+
+# Заголовок месяца — вся ячейка: название месяца (полное, в любом падеже,
+# или сокращение с точкой) и, если есть, год, например «Январь 2024»,
+# «янв. 2024 г.», «марта 2024 года», «Январь». «Мартини» или «Маркер, 2024»
+# заголовком не считаются.
+MONTH_HEADER = re.compile(
+    r'^\s*(?P<month>'
+    r'январ[ьяе]|феврал[ьяе]|марта?|марте|апрел[ьяе]|ма[йяе]|июн[ьяе]|июл[ьяе]|'
+    r'августа?|августе|сентябр[ьяе]|октябр[ьяе]|ноябр[ьяе]|декабр[ьяе]|'
+    r'янв|фев|мар|апр|июн|июл|авг|сент?|окт|ноя|дек'
+    r')\.?(?:\s+(?P<year>\d{4})(?:\s*(?:г\.?|года?))?)?\s*$',
+    re.IGNORECASE,
+)
+
+# Номер месяца по первым трём буквам названия («май», «мая», «мае» — «ма»)
+_MONTH_NUMBERS = {name[:3].lower(): number for number, name in enumerate(MONTH_NAMES)}
+_MONTH_NUMBERS['мая'] = _MONTH_NUMBERS['мае'] = _MONTH_NUMBERS['май']
+
+
+def period_code(year: int, month: int) -> int:
+    """Код периода по году и номеру месяца (1-12)"""
+    return year * 12 + month - 1
+
+
+def period_label(code: int) -> str:
+    """Подпись периода для людей: «Январь 2024» (или «Январь», если год неизвестен)"""
+    year, month = divmod(int(code), 12)
+    return f'{MONTH_NAMES[month]} {year}' if year else MONTH_NAMES[month]
+
+
+def parse_periods(cells: pd.Series) -> pd.Series:
+    """Коды периодов для ячеек-заголовков месяца; остальные ячейки — NA.
+
+    Одно регулярное выражение на всю колонку (str.extract), без цикла по строкам.
+    """
+    parts = cells.astype(str).str.extract(MONTH_HEADER)
+    matched = parts['month'].notna().to_numpy()
+    codes = pd.array(np.full(len(cells), pd.NA), dtype=PERIOD_DTYPE)
+    if matched.any():
+        months = parts.loc[matched, 'month'].str.lower().str.slice(0, 3).map(_MONTH_NUMBERS)
+        years = parts.loc[matched, 'year'].fillna('0').astype(np.int32)
+        codes[matched] = (years * 12 + months).to_numpy(dtype=np.int32)
+    return pd.Series(codes, index=cells.index, dtype=PERIOD_DTYPE)
@@ -0,0 +1,163 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Optional, Sequence, Tuple, Union
+
+import pandas as pd
+from config.column_schema import StandardColumns
+from config.schema import Recommendations, Thresholds
+from core.aggregation import aggregate_sales
+from core.analyzer import ABCAnalyzer, XYZAnalyzer
+from core.instrumentation import ProgressCallback, stage
+from core.parallel_loader import load_inputs
+from core.recommendations import RecommendationTable, class_codes, class_columns
+from core.stock_index import StockIndex
+
+logger = logging.getLogger(__name__)
+
+# Значение колонки Склад для строк анализа по сети в целом
+NETWORK_LABEL = 'Вся сеть'
+
+
+class AnalysisPipeline:
+    """Полный расчёт ABC/XYZ: продажи + остатки -> таблица с классами и рекомендациями.
+
+    Не зависит от GUI: используется и окном, и консольным режимом (cli.py).
+    progress(stage) вызывается перед каждым этапом.
+    """
+
+    def __init__(self, thresholds: Thresholds, recommendations: Optional[Recommendations] = None,
+                 include_empty_months: bool = False):
+        self.thresholds = thresholds
+        self.recommendations = recommendations or Recommendations()
+        # XYZ по всем месяцам отчёта: месяц без продаж позиции — нулевая выручка
+        self.include_empty_months = include_empty_months
+        self.recommendation_table = RecommendationTable(self.recommendations)
+        self.abc_analyzer = ABCAnalyzer(thresholds)
+        self.xyz_analyzer = XYZAnalyzer(thresholds)
+        self._stock_index = (None, None)  # (DataFrame остатков, его StockIndex)
+
+    def run_files(self, sales_path: Union[str, Sequence[str]], stock_path: str, progress: ProgressCallback = None,
+                  jobs: int = 1, all_sheets: bool = False) -> pd.DataFrame:
+        """Загружает файлы и выполняет расчёт.
+
+        sales_path — файл или список файлов продаж (склеиваются в один отчёт);
+        all_sheets — разбирать все листы книг продаж, а не только первый.
+        При jobs > 1 файлы и листы разбираются параллельно в jobs процессах.
+        """
+        _report(progress, 'Загрузка файлов')
+        sales, stock = load_inputs(sales_path, stock_path, jobs, all_sheets)
+        return self.run(sales, stock, progress)
+
+    def run(self, sales: pd.DataFrame, stock: pd.DataFrame, progress: ProgressCallback = None) -> pd.DataFrame:
+        """Рассчитывает ABC/XYZ по уже загруженным продажам и остаткам"""
+        # Один проход агрегации для ABC и XYZ
+        with _stage(progress, 'Агрегация продаж', rows_in=len(sales)) as st:
+            aggregates = aggregate_sales(sales)
+            st.rows_out = len(aggregates.skus)
+        return self.classify(aggregates, stock, progress)
+
+    def classify(self, aggregates, stock: pd.DataFrame, progress: ProgressCallback = None,
+                 group: Optional[str] = None) -> pd.DataFrame:
+        """Классы, остатки и рекомендации по готовым агрегатам.
+
+        aggregates — любой объект с abc_frame() и monthly_stats(), строки
+        которых совпадают по позиции (SalesAggregates, IncrementalAnalysis).
+        group — колонка группы в агрегатах: ABC считается внутри групп.
+        """
+        with _stage(progress, 'ABC-анализ', rows_in=len(aggregates)) as st:
+            df = self.abc_analyzer.analyze(aggregates.abc_frame(), group=group)
+            st.rows_out = len(df)
+
+        # XYZ-анализ по помесячным суммам; строки совпадают с ABC по позиции
+        with _stage(progress, 'XYZ-анализ', rows_in=len(aggregates)) as st:
+            xyz_df = self.xyz_analyzer.analyze(aggregates.monthly_stats(self.include_empty_months))
+            # CV сохраняется в результате: по нему переклассифицирует ThresholdTuner
+            df[StandardColumns.CV] = xyz_df[StandardColumns.CV]
+            # Позиции без единой строки с месяцем XYZ не получают
+            df[StandardColumns.XYZ] = xyz_df[StandardColumns.XYZ].where(xyz_df['count'] > 0)
+            st.rows_out = len(xyz_df)
+
+        # Добавляем остатки: повторы артикула в остатках сложены, строки не размножаются;
+        # при анализе по складам и складах в остатках — остаток своего склада (если он найден)
+        with _stage(progress, 'Объединение результатов', rows_in=len(df) + len(stock)) as st:
+            warehouses = df[group] if group == StandardColumns.SKLAD else None
+            quantity, coverage = self.stock_index(stock).attach(df[StandardColumns.ARTIKUL], warehouses)
+            df[StandardColumns.OSTATOK] = quantity
+            if len(coverage.unmatched_warehouses):
+                logger.warning('Остатки: %s', coverage.describe())
+            elif len(coverage.missing) or len(coverage.unused):
+                logger.info('Остатки: %s', coverage.describe())
+            st.rows_out = len(df)
+
+        # ABC, XYZ, ABC_XYZ и Рекомендация — категории; рекомендации берутся из таблицы по кодам
+        with _stage(progress, 'Рекомендации', rows_in=len(df)) as st:
+            abc, xyz = class_codes(df)
+            for col, values in class_columns(abc, xyz, self.recommendation_table).items():
+                df[col] = values
+            st.rows_out = len(df)
+        return df
+
+    def stock_index(self, stock: pd.DataFrame) -> StockIndex:
+        """StockIndex остатков; для того же DataFrame строится один раз"""
+        if self._stock_index[0] is not stock:
+            self._stock_index = (stock, StockIndex(stock))
+        return self._stock_index[1]
+
+    def run_by_warehouse(self, sales: pd.DataFrame, stock: pd.DataFrame, jobs: int = 1,
+                         progress: ProgressCallback = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """ABC/XYZ по каждому складу отдельно и по сети в целом.
+
+        Возвращает (таблица с колонкой Склад, матрица ABC_XYZ: склады x коды).
+        Строки сети помечены складом NETWORK_LABEL. Все склады считаются
+        за один векторный проход; при jobs > 1 склады делятся между процессами.
+        """
+        warehouse_codes, warehouses = pd.factorize(sales[StandardColumns.SKLAD])
+        n_parts = min(jobs, len(warehouses))
+
+        _report(progress, 'Анализ по складам')
+        if n_parts > 1:
+            parts = [sales[warehouse_codes % n_parts == i] for i in range(n_parts)]
+            with ProcessPoolExecutor(max_workers=n_parts) as pool:
+                by_warehouse = pd.concat(
+                    pool.map(_run_warehouses, parts, repeat(stock), repeat(self.thresholds),
+                             repeat(self.recommendations), repeat(self.include_empty_months)),
+                    ignore_index=True,
+                )
+            by_warehouse[StandardColumns.SKLAD] = by_warehouse[StandardColumns.SKLAD].astype(str)
+            by_warehouse = by_warehouse.sort_values(StandardColumns.SKLAD, kind='stable', ignore_index=True)
+        else:
+            by_warehouse = self._run_warehouses(sales, stock)
+
+        _report(progress, 'Анализ по сети')
+        network = self.run(sales, stock)
+        network.insert(0, StandardColumns.SKLAD, NETWORK_LABEL)
+
+        df = pd.concat([by_warehouse.astype({StandardColumns.SKLAD: str}), network], ignore_index=True)
+        matrix = pd.crosstab(df[StandardColumns.SKLAD], df['ABC_XYZ'])
+        return df, matrix
+
+    def _run_warehouses(self, sales: pd.DataFrame, stock: pd.DataFrame) -> pd.DataFrame:
+        aggregates = aggregate_sales(sales, group=StandardColumns.SKLAD)
+        return self.classify(aggregates, stock, group=StandardColumns.SKLAD)
+
+
+def _run_warehouses(sales: pd.DataFrame, stock: pd.DataFrame, thresholds: Thresholds,
+                    recommendations: Recommendations, include_empty_months: bool) -> pd.DataFrame:
+    # Точка входа для дочерних процессов run_by_warehouse
+    pipeline = AnalysisPipeline(thresholds, recommendations, include_empty_months)
+    return pipeline._run_warehouses(sales, stock)
+
+
+def _report(progress: ProgressCallback, stage: str) -> None:
+    if progress is not None:
+        progress(stage)
+
+
+@contextmanager
+def _stage(progress: ProgressCallback, name: str, rows_in: Optional[int] = None):
+    # Сообщает о начале этапа и замеряет его (см. core.instrumentation)
+    _report(progress, name)
+    with stage(name, rows_in) as st:
+        yield st
@@ -0,0 +1,106 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Сколько позиций брать в первую попытку revenue_share_positions
+_FIRST_GUESS = 64
+
+
+def _clean(revenue) -> np.ndarray:
+    # Пустая выручка считается нулевой, как sum()/cumsum() в pandas
+    revenue = np.asarray(revenue, dtype=float)
+    return np.where(np.isnan(revenue), 0.0, revenue)
+
+
+class RevenueRanking:
+    """Ранжирование позиций по выручке (кривая Парето) за одну сортировку numpy.
+
+    Порядок: по убыванию выручки, при равной выручке — по исходной позиции
+    строки (строки агрегатов упорядочены по ключу, так что результат не
+    зависит от порядка строк продаж). С groups ранжирование идёт внутри
+    каждой группы. Классы ABC по накопленной доле назначает ABCAnalyzer —
+    тем же сравнением с порогами, что и ThresholdTuner.
+    """
+
+    def __init__(self, revenue, groups: Optional[np.ndarray] = None):
+        revenue = _clean(revenue)
+        n = len(revenue)
+        if groups is None:
+            self.order = np.argsort(-revenue, kind='stable')
+            group_codes = np.zeros(n, dtype=np.int64)
+        else:
+            group_codes = np.asarray(groups)
+            # lexsort устойчив: при равных группе и выручке остаётся исходный порядок
+            self.order = np.lexsort((-revenue, group_codes))
+
+        sorted_groups = group_codes[self.order]
+        new_group = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]] if n else np.zeros(0, dtype=bool)
+        starts = np.flatnonzero(new_group)
+        group_of_sorted = np.cumsum(new_group) - 1
+
+        # Доля выручки в группе и накопленная доля, в порядке сортировки
+        sorted_revenue = revenue[self.order]
+        totals = np.bincount(group_of_sorted, weights=sorted_revenue, minlength=len(starts))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.sorted_share = sorted_revenue / totals[group_of_sorted]
+        self.sorted_cum_share = pd.Series(self.sorted_share).groupby(group_of_sorted).cumsum().to_numpy()
+
+        # Место позиции в своей группе (0 — самая большая выручка)
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[self.order] = np.arange(n) - starts[group_of_sorted]
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def share(self) -> np.ndarray:
+        """Доля выручки позиции в её группе (в исходном порядке строк)"""
+        return self._unsort(self.sorted_share)
+
+    def cum_share(self) -> np.ndarray:
+        """Накопленная доля: доля позиции вместе со всеми позициями выше неё по выручке"""
+        return self._unsort(self.sorted_cum_share)
+
+    def _unsort(self, values: np.ndarray) -> np.ndarray:
+        result = np.empty_like(values)
+        result[self.order] = values
+        return result
+
+
+def top_n(revenue, n: int) -> np.ndarray:
+    """Позиции n самых больших по выручке, по убыванию, без полной сортировки.
+
+    argpartition выделяет n лучших за O(len), сортируются только они;
+    при равной выручке раньше идёт меньшая позиция, как в RevenueRanking.
+    """
+    revenue = _clean(revenue)
+    n = max(0, min(n, len(revenue)))
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if n < len(revenue):
+        candidates = np.argpartition(-revenue, n - 1)[:n]
+        # Позиции с той же выручкой, что и n-я, могли попасть не все — добираем их
+        boundary = revenue[candidates].min()
+        candidates = np.union1d(candidates, np.flatnonzero(revenue == boundary))
+    else:
+        candidates = np.arange(len(revenue))
+    order = np.lexsort((candidates, -revenue[candidates]))
+    return candidates[order][:n]
+
+
+def revenue_share_positions(revenue, share: float) -> np.ndarray:
+    """Наименьший набор самых продаваемых позиций, дающий не меньше share выручки.
+
+    Порядок тот же, что у RevenueRanking. Полная сортировка не нужна:
+    берутся top_n для растущего n, пока их выручка не достигнет доли.
+    """
+    revenue = _clean(revenue)
+    target = share * revenue.sum()
+    n = min(_FIRST_GUESS, len(revenue))
+    while True:
+        top = top_n(revenue, n)
+        cumulative = np.cumsum(revenue[top])
+        reached = np.searchsorted(cumulative, target, side='left')
+        if reached < len(top) or n >= len(revenue):
+            return top[:reached + 1]
+        n = min(n * 4, len(revenue))
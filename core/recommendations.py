@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+from config.schema import Recommendations
+from core.analyzer import ABCAnalyzer, XYZAnalyzer
+
+# Код XYZ для позиций без строк с месяцем: XYZ, ABC_XYZ пустые
+NO_XYZ = -1
+
+ABC_DTYPE = pd.CategoricalDtype(list(ABCAnalyzer.labels))
+XYZ_DTYPE = pd.CategoricalDtype(list(XYZAnalyzer.labels))
+# Код ABC_XYZ = код ABC * 3 + код XYZ: AX, AY, AZ, BX, ...
+ABC_XYZ_DTYPE = pd.CategoricalDtype([a + x for a in ABCAnalyzer.labels for x in XYZAnalyzer.labels])
+
+
+class RecommendationTable:
+    """Рекомендации по кодам классов: таблица 3×3 и текст для позиций без XYZ.
+
+    Каждый текст хранится один раз, как категория; в строках результата —
+    только коды категорий.
+    """
+
+    def __init__(self, recommendations: Recommendations = None):
+        recommendations = recommendations or Recommendations()
+        # Последний столбец — позиции без XYZ (индекс NO_XYZ = -1)
+        texts = [
+            [getattr(recommendations, a + x) for x in XYZAnalyzer.labels] + [recommendations.unknown]
+            for a in ABCAnalyzer.labels
+        ]
+        categories = list(dict.fromkeys(text for row in texts for text in row))
+        self.dtype = pd.CategoricalDtype(categories)
+        self.codes = np.array([[categories.index(text) for text in row] for row in texts], dtype=np.int8)
+
+    def lookup(self, abc, xyz) -> pd.Categorical:
+        """Рекомендации для массивов кодов ABC и XYZ"""
+        return pd.Categorical.from_codes(self.codes[abc, xyz], dtype=self.dtype)
+
+
+def class_codes(df: pd.DataFrame):
+    """Коды ABC и XYZ (NO_XYZ — нет XYZ) из категориальных колонок результата"""
+    abc = df[StandardColumns.ABC].cat.codes.to_numpy(dtype=np.int8)
+    xyz = df[StandardColumns.XYZ].cat.codes.to_numpy(dtype=np.int8)
+    return abc, xyz
+
+
+def class_columns(abc, xyz, table: RecommendationTable) -> dict:
+    """Колонки ABC, XYZ, ABC_XYZ и Рекомендация по кодам классов"""
+    abc = np.asarray(abc, dtype=np.int8)
+    xyz = np.asarray(xyz, dtype=np.int8)
+    pair = np.where(xyz == NO_XYZ, -1, abc * len(XYZAnalyzer.labels) + xyz)
+    return {
+        StandardColumns.ABC: pd.Categorical.from_codes(abc, dtype=ABC_DTYPE),
+        StandardColumns.XYZ: pd.Categorical.from_codes(xyz, dtype=XYZ_DTYPE),
+        StandardColumns.ABC_XYZ: pd.Categorical.from_codes(pair, dtype=ABC_XYZ_DTYPE),
+        StandardColumns.REKOMENDACIA: table.lookup(abc, xyz),
+    }
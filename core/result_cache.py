@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+from config.schema import Thresholds
+from core.aggregation import aggregate_sales
+from core.dataset_cache import CACHE_VERSION
+from core.instrumentation import ProgressCallback, stage
+
+logger = logging.getLogger(__name__)
+
+
+class LRUStore:
+    """Ограниченное по числу записей хранилище с вытеснением давно не использованных.
+
+    Если задан cache_dir, записи дублируются на диск (pickle); на диске
+    хранится не больше max_disk_entries файлов, лишние удаляются по дате
+    последнего обращения.
+    """
+
+    def __init__(self, max_entries: int, cache_dir: Optional[Path] = None,
+                 prefix: str = 'entry', max_disk_entries: int = 64):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.prefix = prefix
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[Hashable, object]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: Hashable):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except Exception as e:
+            logger.warning('Не удалось прочитать кэш %s: %s', path, e)
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        self._remember(key, value)
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._prune_disk()
+        except Exception as e:
+            logger.warning('Не удалось сохранить кэш %s: %s', path, e)
+
+    def clear(self) -> None:
+        """Очищает записи в памяти (файлы на диске не трогает)"""
+        self._memory.clear()
+
+    def _remember(self, key: Hashable, value) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: Hashable) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{self.prefix}_{digest}_v{CACHE_VERSION}.pkl'
+
+    def _prune_disk(self) -> None:
+        files = sorted(self.cache_dir.glob(f'{self.prefix}_*.pkl'), key=lambda p: p.stat().st_mtime)
+        for path in files[:-self.max_disk_entries]:
+            path.unlink(missing_ok=True)
+
+
+def thresholds_key(thresholds: Thresholds) -> tuple:
+    """Значения порогов в виде ключа кэша"""
+    return tuple(sorted(thresholds.model_dump().items()))
+
+
+def settings_key(pipeline) -> tuple:
+    """Настройки конвейера, от которых зависит результат: пороги, тексты рекомендаций и учёт пустых месяцев"""
+    return (thresholds_key(pipeline.thresholds), tuple(sorted(pipeline.recommendations.model_dump().items())),
+            pipeline.include_empty_months)
+
+
+class ResultCache:
+    """Кэш результатов анализа.
+
+    Результат хранится по ключу (хэш продаж, хэш остатков, настройки): повторный
+    расчёт с теми же файлами и порогами не выполняется. Агрегаты продаж
+    хранятся отдельно по хэшу продаж, поэтому при смене одних только порогов
+    заново выполняется лишь классификация (AnalysisPipeline.classify).
+    Хэши файлов даёт DatasetCache.digest.
+    """
+
+    def __init__(self, max_results: int = 16, max_aggregates: int = 4, cache_dir: Optional[Path] = None):
+        self.results = LRUStore(max_results, cache_dir, prefix='result')
+        # Агрегаты занимают больше места и на диск не сохраняются
+        self.aggregates = LRUStore(max_aggregates)
+
+    def missing_inputs(self, pipeline, sales_key: str, stock_key: str) -> Tuple[bool, bool]:
+        """Какие файлы придётся загрузить analyze: (продажи, остатки)"""
+        if self.results.get((sales_key, stock_key, settings_key(pipeline))) is not None:
+            return False, False
+        return self.aggregates.get(sales_key) is None, True
+
+    def analyze(self, pipeline, sales_key: str, stock_key: str,
+                load_sales: Callable[[], pd.DataFrame], load_stock: Callable[[], pd.DataFrame],
+                progress: ProgressCallback = None) -> pd.DataFrame:
+        """Результат pipeline для пары файлов; загрузчики вызываются только при промахе кэша.
+
+        Возвращаемый DataFrame общий для всех вызовов — не изменяйте его на месте.
+        """
+        key = (sales_key, stock_key, settings_key(pipeline))
+        df = self.results.get(key)
+        if df is not None:
+            return df
+
+        aggregates = self.aggregates.get(sales_key)
+        if aggregates is None:
+            sales = load_sales()
+            if progress is not None:
+                progress('Агрегация продаж')
+            with stage('Агрегация продаж', rows_in=len(sales)) as st:
+                aggregates = aggregate_sales(sales)
+                st.rows_out = len(aggregates)
+            self.aggregates.put(sales_key, aggregates)
+
+        df = pipeline.classify(aggregates, load_stock(), progress)
+        self.results.put(key, df)
+        return df
+
+    def clear(self) -> None:
+        self.results.clear()
+        self.aggregates.clear()
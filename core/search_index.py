@@ -0,0 +1,50 @@
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+# Разделитель колонок в строке поиска: с клавиатуры его не ввести,
+# поэтому запрос не может «склеить» конец одной колонки с началом другой
+_SEPARATOR = '\x1f'
+
+
+class SearchIndex:
+    """Индекс для поиска по мере ввода.
+
+    Для каждой строки результата один раз строится строка в нижнем регистре
+    из всех колонок поиска. Если новый запрос содержит предыдущий (обычный
+    случай при наборе текста), фильтруются только строки, найденные в
+    прошлый раз.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str]):
+        parts = [df[col].astype(str).str.lower() for col in columns if col in df.columns]
+        if parts:
+            haystack = parts[0].str.cat(parts[1:], sep=_SEPARATOR) if len(parts) > 1 else parts[0]
+        else:
+            haystack = pd.Series('', index=df.index)
+        self._haystack = haystack.reset_index(drop=True)
+        self._all = np.arange(len(df))
+        self._last_query = ''
+        self._last_positions = self._all
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def search(self, query: str) -> np.ndarray:
+        """Позиции строк (по порядку в исходном DataFrame), содержащих query"""
+        query = query.lower().strip()
+        if not query:
+            return self._all
+
+        if self._last_query and self._last_query in query:
+            candidates = self._last_positions
+        else:
+            candidates = self._all
+
+        mask = self._haystack.iloc[candidates].str.contains(query, regex=False).to_numpy(dtype=bool)
+        positions = candidates[mask]
+
+        self._last_query = query
+        self._last_positions = positions
+        return positions
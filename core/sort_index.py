@@ -0,0 +1,91 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Ключ сортировки: (колонка, по убыванию)
+SortKey = Tuple[str, bool]
+
+
+def _dense_rank(values: pd.Series) -> np.ndarray:
+    """Место значения среди различных значений колонки (0, 1, ...); пустые — в конце"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Категории сравниваются по значению, а не по порядку категорий
+        category_rank, _ = pd.factorize(values.cat.categories, sort=True)
+        codes = values.cat.codes.to_numpy()
+        rank = np.where(codes >= 0, category_rank[codes], -1)
+    else:
+        if not pd.api.types.is_numeric_dtype(values):
+            # Текст из одних чисел (например, артикулы) сортируется как числа
+            numbers = pd.to_numeric(values, errors='coerce')
+            if numbers.notna().sum() == values.notna().sum():
+                values = numbers
+        rank, _ = pd.factorize(values, sort=True)
+    return np.where(rank >= 0, rank, rank.max(initial=-1) + 1).astype(np.int64)
+
+
+class SortIndex:
+    """Порядок строк результата по колонкам, посчитанный один раз.
+
+    Для колонки и направления при первом обращении строится стабильная
+    перестановка argsort, а сортировка результата поиска — выборка из
+    перестановки нужных строк, без повторной сортировки. Для нескольких
+    колонок строки упорядочиваются np.lexsort по рангам значений (тоже
+    посчитанным один раз). В любом направлении пустые значения идут в конце,
+    а равные — в исходном порядке строк.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._ranks: Dict[str, np.ndarray] = {}
+        self._orders: Dict[SortKey, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def rank(self, col: str) -> np.ndarray:
+        if col not in self._ranks:
+            self._ranks[col] = _dense_rank(self._df[col])
+        return self._ranks[col]
+
+    def empty(self, col: str) -> np.ndarray:
+        """Маска пустых значений колонки (у них наибольший ранг)"""
+        return self._df[col].isna().to_numpy()
+
+    def permutation(self, col: str, descending: bool = False) -> np.ndarray:
+        """Позиции строк по колонке; равные значения — в исходном порядке, пустые — в конце"""
+        key = (col, descending)
+        if key not in self._orders:
+            rank = self.rank(col)
+            if descending:
+                # Ранги непустых значений >= 0: -rank <= 0, а пустым — 1, то есть в конец
+                rank = np.where(self.empty(col), 1, -rank)
+            self._orders[key] = np.argsort(rank, kind='stable')
+        return self._orders[key]
+
+    def order(self, keys: Sequence[SortKey], positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Позиции строк (все или только positions) в порядке сортировки по keys"""
+        if len(keys) == 1:
+            order = self.permutation(*keys[0])
+            if positions is None:
+                return order
+            selected = np.zeros(len(self._df), dtype=bool)
+            selected[positions] = True
+            return order[selected[order]]
+
+        positions = np.arange(len(self._df)) if positions is None else np.asarray(positions)
+        # lexsort: последний ключ — главный; по каждой колонке сначала признак
+        # пустого значения (пустые в конце), затем ранг; lexsort устойчив
+        columns = []
+        for col, descending in keys:
+            rank = self.rank(col)[positions]
+            columns += [self.empty(col)[positions], -rank if descending else rank]
+        return positions[np.lexsort(columns[::-1])]
+
+    def update(self, df: pd.DataFrame, columns: Iterable[str]) -> None:
+        """Новый DataFrame с теми же строками, в котором изменились columns"""
+        self._df = df
+        for col in columns:
+            self._ranks.pop(col, None)
+            for descending in (False, True):
+                self._orders.pop((col, descending), None)
@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+
+# Сколько артикулов показывать в примере
+DEFAULT_SAMPLES = 5
+
+
+def _key_index(values) -> pd.Index:
+    # Ключи — объекты Python: у строк хэш кэшируется, и хэш-таблица индекса
+    # строится один раз; категории разных файлов при этом не обязаны совпадать
+    return pd.Index(np.asarray(values, dtype=object), dtype=object)
+
+
+def _warehouse_keys(values) -> pd.Index:
+    # Склады продаж (заголовки отчёта) и остатков (колонка) сравниваются без учёта
+    # регистра и лишних пробелов: «Склад  Центральный » == «склад центральный»
+    names = pd.Series(np.asarray(values, dtype=object)).astype(str)
+    return _key_index(names.str.split().str.join(' ').str.lower())
+
+
+def _gather(index: pd.Index, quantity: np.ndarray, codes: np.ndarray, keys: pd.Index):
+    """Количество для кодов строк (codes — номера в keys, -1 — пусто) и несопоставленные ключи"""
+    key_positions = index.get_indexer(keys)
+    # Код -1 (пустой ключ) попадает на добавленный в конец -1
+    positions = np.append(key_positions, -1)[codes]
+    found = positions >= 0
+    values = np.zeros(len(codes))
+    values[found] = quantity[positions[found]]
+
+    used = np.zeros(len(index), dtype=bool)
+    used[key_positions[key_positions >= 0]] = True
+    return values, keys[key_positions < 0], index[~used]
+
+
+@dataclass
+class StockCoverage:
+    """Расхождения артикулов продаж и остатков"""
+
+    missing: pd.Index  # Артикулы: есть в продажах, нет в остатках (остаток считается 0)
+    unused: pd.Index   # Артикулы: есть в остатках, нет в продажах
+    # Склады продаж, которых нет в остатках: для них взят остаток артикула по всем складам
+    unmatched_warehouses: pd.Index = field(default_factory=lambda: pd.Index([], dtype=object))
+
+    def describe(self, max_samples: int = DEFAULT_SAMPLES) -> str:
+        """Строка для журнала: сколько ключей не сопоставлено и примеры"""
+        parts = []
+        for label, keys in (('нет в остатках', self.missing), ('нет в продажах', self.unused),
+                            ('склады не найдены в остатках, взят остаток по сети', self.unmatched_warehouses)):
+            if len(keys):
+                samples = ', '.join(repr(key) for key in keys[:max_samples])
+                parts.append(f'{label}: {len(keys)}, например: {samples}')
+        return '; '.join(parts)
+
+
+class StockIndex:
+    """Остатки, сложенные по ключу — артикулу или, если есть колонка Склад, складу и артикулу.
+
+    Повторы ключа в файле остатков (строки по партиям, складам) складываются,
+    поэтому при добавлении остатков строки результата не размножаются.
+    Ключи кодируются один раз; остаток для строк результата — get_indexer
+    по ключам и выборка из массива, без слияния таблиц.
+    """
+
+    def __init__(self, stock: pd.DataFrame):
+        self.by_warehouse = StandardColumns.SKLAD in stock.columns
+        quantity = stock[StandardColumns.OSTATOK].to_numpy(dtype=float)
+        quantity = np.where(np.isnan(quantity), 0.0, quantity)
+
+        article_codes, articles = pd.factorize(stock[StandardColumns.ARTIKUL])
+        valid = article_codes >= 0
+        self.articles = _key_index(articles)
+        self.quantity = np.bincount(article_codes[valid], weights=quantity[valid], minlength=len(articles))
+        key_codes = article_codes
+
+        if self.by_warehouse:
+            # Склады нормализуются до кодирования: «Склад 1» и «СКЛАД  1» — один склад
+            warehouse_names = stock[StandardColumns.SKLAD]
+            warehouse_codes, warehouses = pd.factorize(_warehouse_keys(warehouse_names).where(warehouse_names.notna()))
+            valid &= warehouse_codes >= 0
+            size = max(len(articles), 1)
+            combined = warehouse_codes[valid].astype(np.int64) * size + article_codes[valid]
+            pairs, pair_codes = np.unique(combined, return_inverse=True)
+            self.warehouses = _key_index(warehouses)
+            self.pairs = pd.MultiIndex.from_arrays([
+                self.warehouses.take(pairs // size), _key_index(articles.take(pairs % size)),
+            ])
+            self.pair_quantity = np.bincount(pair_codes, weights=quantity[valid], minlength=len(pairs))
+            key_codes = np.full(len(stock), -1, dtype=np.int64)
+            key_codes[valid] = pair_codes
+
+        # Первая строка каждого ключа (коды ключей — номера строк quantity/pair_quantity)
+        keys, first_rows = np.unique(key_codes[valid], return_index=True)
+        self._first_rows = np.flatnonzero(valid)[first_rows]
+        self.duplicates = int(valid.sum()) - len(keys)
+        self._stock = stock
+
+    def __len__(self) -> int:
+        return len(self.pairs) if self.by_warehouse else len(self.articles)
+
+    def attach(self, articles, warehouses=None):
+        """Остаток для каждой строки (артикул[, склад]) и расхождения ключей.
+
+        warehouses учитываются, только если в остатках есть склады. Для склада,
+        которого нет в остатках (название не совпало), и без warehouses берётся
+        остаток артикула по всем строкам остатков. missing/unused в результате —
+        по артикулам; не найденные склады — в unmatched_warehouses.
+        """
+        # Для категорий factorize берёт готовые коды: строки сравниваются один раз на артикул
+        codes, keys = pd.factorize(articles)
+        values, missing, unused = _gather(self.articles, self.quantity, codes, _key_index(keys))
+        coverage = StockCoverage(missing=missing, unused=unused)
+        if warehouses is None or not self.by_warehouse:
+            return values, coverage
+
+        warehouse_codes, warehouse_values = pd.factorize(warehouses)
+        warehouse_keys = _warehouse_keys(warehouse_values)
+        known = warehouse_keys.isin(self.warehouses)
+        coverage.unmatched_warehouses = _key_index(warehouse_values)[~known]
+        rows = np.append(known, False)[warehouse_codes]
+        if rows.any():
+            pair_codes, pair_keys = pd.factorize(pd.MultiIndex.from_arrays([
+                warehouse_keys.take(warehouse_codes[rows]), _key_index(np.asarray(articles, dtype=object)[rows]),
+            ]))
+            values[rows], _, _ = _gather(self.pairs, self.pair_quantity, pair_codes, pair_keys)
+        return values, coverage
+
+    def frame(self) -> pd.DataFrame:
+        """Остатки по одной строке на ключ: название — из первой строки ключа, количество — сумма"""
+        df = self._stock.iloc[self._first_rows].reset_index(drop=True)
+        df[StandardColumns.OSTATOK] = self.pair_quantity if self.by_warehouse else self.quantity
+        return df
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+from config.schema import Recommendations, Thresholds
+from core.recommendations import NO_XYZ, RecommendationTable, class_columns
+
+# Колонки результата, которые зависят от порогов
+CLASS_COLUMNS = [StandardColumns.ABC, StandardColumns.XYZ, StandardColumns.ABC_XYZ, StandardColumns.REKOMENDACIA]
+
+
+class _SortedValues:
+    """Значения, отсортированные один раз: число значений <= порога — searchsorted"""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        order = np.argsort(values, kind='stable')  # NaN уходят в конец
+        self.sorted = values[order]
+        # Место каждого значения в отсортированном порядке
+        self.rank = np.empty(len(values), dtype=np.int64)
+        self.rank[order] = np.arange(len(values))
+
+    def codes(self, first: float, second: float) -> np.ndarray:
+        """Коды классов 0/1/2, как у ThresholdClassifier.classify_codes_many"""
+        n_first = np.searchsorted(self.sorted, first, side='right')
+        n_second = np.searchsorted(self.sorted, second, side='right')
+        return np.where(self.rank < n_first, 0, np.where(self.rank < n_second, 1, 2)).astype(np.int8)
+
+
+class ThresholdTuner:
+    """Мгновенная переклассификация готового результата при смене порогов.
+
+    Накопленные доли (Накопл) и CV сортируются один раз; после этого граница
+    каждого класса — один searchsorted, а классы всех позиций — сравнение
+    их места в сортировке с границей. Конвейер заново не запускается.
+    """
+
+    def __init__(self, df: pd.DataFrame, thresholds: Thresholds, recommendations: Recommendations = None):
+        self._cum_share = _SortedValues(df[StandardColumns.NAKOPITEL])
+        self._cv = _SortedValues(df[StandardColumns.CV])
+        # Позиции без строк с месяцем XYZ не получают при любых порогах
+        self._dated = df[StandardColumns.XYZ].notna().to_numpy()
+        self._table = RecommendationTable(recommendations)
+
+        self.thresholds = thresholds
+        self.abc, self.xyz = self._codes(thresholds)
+
+    def _codes(self, t: Thresholds):
+        abc = self._cum_share.codes(t.A, t.B)
+        xyz = np.where(self._dated, self._cv.codes(t.X, t.Y), NO_XYZ).astype(np.int8)
+        return abc, xyz
+
+    def update(self, thresholds: Thresholds) -> np.ndarray:
+        """Применяет новые пороги; возвращает позиции строк, у которых сменились классы"""
+        abc, xyz = self._codes(thresholds)
+        changed = np.flatnonzero((abc != self.abc) | (xyz != self.xyz))
+        self.thresholds = thresholds
+        self.abc, self.xyz = abc, xyz
+        return changed
+
+    def class_columns(self, rows=None) -> dict:
+        """Колонки CLASS_COLUMNS (категории) для строк rows (по умолчанию — всех)"""
+        abc = self.abc if rows is None else self.abc[rows]
+        xyz = self.xyz if rows is None else self.xyz[rows]
+        return class_columns(abc, xyz, self._table)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Новый DataFrame с классами по текущим порогам (входной не изменяется)"""
+        df = df.copy(deep=False)
+        for col, values in self.class_columns().items():
+            df[col] = values
+        return df
@@ -1,16 +1,53 @@
 
+import importlib
+import logging
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from pathlib import Path
 from config.column_schema import StandardColumns
-from core.file_loader import load_stock
-from core.load_sales_detailed import load_sales_detailed
-from core.analyzer import ABCAnalyzer, XYZAnalyzer
-from config.schema import AppConfig
+from core.instrumentation import StageLog, profiled, setup_logging, stage
+from gui.job_runner import JobRunner
+from gui.virtual_table import TABLE_COLUMNS, VirtualTable
+from config.schema import AppConfig, Thresholds
+
+# pandas, numpy и модули расчёта при запуске не импортируются: окно
+# появляется сразу, а они подгружаются в фоне (PRELOAD_MODULES) или при
+# первом обращении — импорты внутри методов ниже
+PRELOAD_MODULES = (
+    'numpy', 'pandas',
+    'core.load_sales_detailed', 'core.file_loader', 'core.parallel_loader', 'core.pipeline',
+    'core.dataset_cache', 'core.result_cache', 'core.search_index', 'core.sort_index', 'core.threshold_tuner',
+    'core.exporter',
+)
+PRELOAD_DELAY_MS = 100
+
+logger = logging.getLogger(__name__)
+
+# Ползунки порогов: (поле Thresholds, подпись, от, до)
+THRESHOLD_SLIDERS = [
+    ('A', 'A ≤', 0.5, 1.0), ('B', 'B ≤', 0.5, 1.0),
+    ('X', 'X ≤ CV', 0.0, 1.0), ('Y', 'Y ≤ CV', 0.0, 2.0),
+]
+
+SEARCH_COLUMNS = [
+    StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA, StandardColumns.ABC,
+    StandardColumns.XYZ, 'ABC_XYZ', 'Рекомендация',
+]
+
+
+def _loader(kind):
+    """Загрузчик файла продаж ('sales') или остатков ('stock')"""
+    if kind == 'sales':
+        from core.load_sales_detailed import load_sales_detailed
+        return load_sales_detailed
+    from core.file_loader import load_stock
+    return load_stock
+
 
 class AppGUI:
+    SEARCH_DEBOUNCE_MS = 250
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title('ABC/XYZ-анализатор')
@@ -18,18 +55,94 @@ class AppGUI:
 
         self.sales_path = None
         self.stock_path = None
-        self.df = pd.DataFrame()
+        self.df = None  # Показанные строки результата (None — расчёта ещё не было)
+        self.sort_index = None  # Перестановки сортировки по колонкам результата
+        self.sort_keys = []  # Текущая сортировка: [(колонка, по убыванию), ...]
+        self._shift_click = False
 
         self.config = AppConfig()
-        self.abc_analyzer = ABCAnalyzer(self.config.thresholds)
-        self.xyz_analyzer = XYZAnalyzer(self.config.thresholds)
+
+        # Кэши файлов и результатов создаются при первом обращении (см. _ensure_caches)
+        self._dataset_cache = None
+        self._result_cache = None
+        self._caches_lock = threading.Lock()
+        # Загрузка и расчёт выполняются вне потока Tk
+        self.job_runner = JobRunner(self.root)
 
         self.setup_widgets()
 
+    def _ensure_caches(self):
+        # Вызывается и из потока Tk, и из фоновых задач
+        with self._caches_lock:
+            if self._dataset_cache is None:
+                from core.dataset_cache import DEFAULT_CACHE_DIR, DatasetCache
+                from core.result_cache import ResultCache
+                # Разобранные файлы: каждый файл разбирается один раз, пока не изменится
+                self._dataset_cache = DatasetCache()
+                # Готовые результаты и агрегаты: повтор расчёта или смена порогов без полного пересчёта
+                self._result_cache = ResultCache(cache_dir=DEFAULT_CACHE_DIR / 'results')
+
+    @property
+    def dataset_cache(self):
+        self._ensure_caches()
+        return self._dataset_cache
+
+    @property
+    def result_cache(self):
+        self._ensure_caches()
+        return self._result_cache
+
+    def _preload(self):
+        """Фоновый поток: импортирует модули расчёта, пока пользователь выбирает файлы"""
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:  # Ошибку покажет сам расчёт при обычном импорте
+                logger.warning('Не удалось заранее загрузить %s: %s', name, e)
+                return
+        self._ensure_caches()
+
+    def _start_preload(self):
+        threading.Thread(target=self._preload, name='abc-xyz-preload', daemon=True).start()
+
+    def _has_result(self):
+        return self.original_df is not None and not self.original_df.empty
+
     def sort_by_column(self, col):
-        reverse = getattr(self, 'sort_reverse', {}).get(col, False)
-        self.df = self.df.sort_values(by=col, ascending=not reverse)
-        self.sort_reverse = {col: not reverse}
+        """Щелчок по заголовку: сортировка по колонке; с Shift — добавить колонку к сортировке"""
+        if self.df is None:
+            return
+        directions = dict(self.sort_keys)
+        if self._shift_click and self.sort_keys:
+            # Следующий ключ сортировки; повторный щелчок меняет его направление
+            if col in directions:
+                self.sort_keys = [(c, not d if c == col else d) for c, d in self.sort_keys]
+            else:
+                self.sort_keys = self.sort_keys + [(col, False)]
+        elif len(self.sort_keys) == 1 and col in directions:
+            self.sort_keys = [(col, not directions[col])]
+        else:
+            self.sort_keys = [(col, False)]
+        self._update_headings()
+        self._show_rows(self.df.index.to_numpy())
+
+    def _remember_modifiers(self, event):
+        # Команда заголовка не получает событие — запоминаем, нажат ли Shift
+        self._shift_click = bool(event.state & 0x0001)
+
+    def _update_headings(self):
+        """Стрелки направления (и номер ключа при сортировке по нескольким колонкам)"""
+        marks = {}
+        for i, (col, descending) in enumerate(self.sort_keys, 1):
+            marks[col] = (' ▼' if descending else ' ▲') + (str(i) if len(self.sort_keys) > 1 else '')
+        for col in TABLE_COLUMNS:
+            self.tree.heading(col, text=col + marks.get(col, ''))
+
+    def _show_rows(self, positions=None):
+        """Показывает строки original_df (по умолчанию все) в текущем порядке сортировки"""
+        if self.sort_keys:
+            positions = self.sort_index.order(self.sort_keys, positions)
+        self.df = self.original_df if positions is None else self.original_df.iloc[positions]
         self.update_table()
 
     def setup_widgets(self):
@@ -40,7 +153,8 @@ class AppGUI:
         tk.Button(top_frame, text='Загрузить продажи', command=self.load_sales_file).grid(row=0, column=0, padx=10)
         tk.Button(top_frame, text='Загрузить остатки', command=self.load_stock_file).grid(row=0, column=1, padx=10)
         tk.Button(top_frame, text='Рассчитать', command=self.try_analyze).grid(row=0, column=2, padx=10)
-        tk.Button(top_frame, text='💾 Сохранить в Excel', command=self.save_to_excel).grid(row=0, column=3, padx=10)
+        tk.Button(top_frame, text='💾 Сохранить', command=self.save_to_excel).grid(row=0, column=3, padx=10)
+        tk.Button(top_frame, text='⛔ Отменить', command=self.cancel_analysis).grid(row=0, column=4, padx=10)
 
         # Строка поиска
         search_frame = tk.Frame(self.root)
@@ -57,6 +171,17 @@ class AppGUI:
         self.search_label = tk.Label(search_frame, text='')
         self.search_label.pack(side='left')
 
+        # Пороги классов: текущий результат переклассифицируется при движении ползунка
+        thresholds_frame = tk.Frame(self.root)
+        thresholds_frame.pack(pady=(0, 5))
+        self.threshold_vars = {}
+        for field, label, low, high in THRESHOLD_SLIDERS:
+            var = tk.DoubleVar(value=getattr(self.config.thresholds, field))
+            tk.Scale(thresholds_frame, label=label, variable=var, from_=low, to=high, resolution=0.01,
+                     orient='horizontal', length=150,
+                     command=lambda _value: self.on_thresholds_changed()).pack(side='left', padx=5)
+            self.threshold_vars[field] = var
+
         self.status_label = tk.Label(self.root, text='📁 Загрузите файлы для анализа')
         self.status_label.pack()
 
@@ -72,11 +197,9 @@ class AppGUI:
             tree_frame,
             columns=['Артикул', 'Номенклатура', 'Сумма', 'ABC', 'XYZ', 'Остаток', 'ABC_XYZ', 'Рекомендация'],
             show='headings',
-            yscrollcommand=scrollbar.set,
             xscrollcommand=h_scrollbar.set,
             selectmode='none'
         )
-        scrollbar.config(command=self.tree.yview)
         h_scrollbar.config(command=self.tree.xview)
 
         for col in ['Артикул', 'Номенклатура', 'Сумма', 'ABC', 'XYZ', 'Остаток', 'ABC_XYZ', 'Рекомендация']:
@@ -85,6 +208,10 @@ class AppGUI:
 
         self.tree.pack(expand=True, fill='both')
 
+        # В Treeview живут только видимые строки; данные — в self.df
+        self.table = VirtualTable(self.tree, scrollbar, tags_for_row=self._row_tags)
+        self._display = None  # Отформатированные строки original_df (по позиции строки)
+
         # Настраиваем стили для выделения
         style = ttk.Style()
         style.map("Treeview",
@@ -93,6 +220,7 @@ class AppGUI:
 
         # Привязываем события
         self.tree.bind("<Button-1>", self.on_cell_click)
+        self.tree.bind("<Button-1>", self._remember_modifiers, add='+')
         self.tree.bind("<Control-c>", self.copy_cell_to_clipboard)
         self.tree.bind("<Escape>", self.clear_cell_selection)  # Добавляем Escape для очистки
         self.tree.bind("<Button-3>", self.clear_cell_selection)  # Правая кнопка мыши для очистки
@@ -104,7 +232,10 @@ class AppGUI:
         self.highlighted_items = []  # Для отслеживания подсвеченных элементов
 
         # Сохраняем оригинальные данные для поиска
-        self.original_df = pd.DataFrame()
+        self.original_df = None
+        self.search_index = None
+        self.tuner = None
+        self._search_after_id = None
         self.context_menu = tk.Menu(self.root, tearoff=0)
         self.context_menu.add_command(label="📋 Копировать ячейку", command=self.copy_cell_to_clipboard)
         self.context_menu.add_separator()
@@ -145,7 +276,7 @@ class AppGUI:
 
             if 0 <= col_index < len(col_names):
                 col_name = col_names[col_index]
-                cell_value = self.tree.item(item)['values'][col_index]
+                cell_value = self.table.row_values(self.table.row_of(item))[col_index]
 
                 # Обновляем статус
                 current_status = self.status_label.cget('text')
@@ -172,6 +303,12 @@ class AppGUI:
         # Сохраняем информацию о теге для последующего удаления
         self.selection_tags.append((item, tag_name))
 
+    def _row_tags(self, row):
+        """Теги строки при отрисовке: восстанавливает выделение после прокрутки"""
+        if self.selected_item == str(row) and self.selected_column:
+            return (f"selected_{self.selected_item}_{self.selected_column}",)
+        return ()
+
     def clear_cell_selection(self, event=None):
         """Очищает визуальное выделение ячеек"""
         # Удаляем все теги выделения
@@ -200,7 +337,7 @@ class AppGUI:
         if self.selected_item and self.selected_column:
             try:
                 col_index = int(self.selected_column.replace('#', '')) - 1
-                values = self.tree.item(self.selected_item)['values']
+                values = self.table.row_values(self.table.row_of(self.selected_item))
 
                 if 0 <= col_index < len(values):
                     cell_value = str(values[col_index])
@@ -251,35 +388,32 @@ class AppGUI:
         self.root.update()  # необходимо для некоторых ОС
 
     def on_search(self, event=None):
+        """Откладывает фильтрацию, пока пользователь печатает"""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(self.SEARCH_DEBOUNCE_MS, self.apply_search)
+
+    def apply_search(self):
         """Фильтрует данные по поисковому запросу"""
-        if self.original_df.empty:
+        self._search_after_id = None
+        if not self._has_result():
             return
 
         query = self.search_entry.get().lower().strip()
 
         if not query:
             # Если поисковая строка пуста - показываем все данные
-            self.df = self.original_df.copy()
-            self.update_table()
+            self._show_rows()
             self.search_label.config(text='')
             return
 
-        # Фильтруем данные
-        mask = (
-                self.original_df[StandardColumns.ARTIKUL].astype(str).str.lower().str.contains(query, na=False) |
-                self.original_df[StandardColumns.NOMENCLATURA].astype(str).str.lower().str.contains(query, na=False) |
-                self.original_df.get(StandardColumns.ABC, pd.Series(dtype=str)).astype(str).str.lower().str.contains(
-                    query, na=False) |
-                self.original_df.get(StandardColumns.XYZ, pd.Series(dtype=str)).astype(str).str.lower().str.contains(
-                    query, na=False) |
-                self.original_df.get('ABC_XYZ', pd.Series(dtype=str)).astype(str).str.lower().str.contains(query,
-                                                                                                           na=False) |
-                self.original_df.get('Рекомендация', pd.Series(dtype=str)).astype(str).str.lower().str.contains(query,
-                                                                                                                na=False)
-        )
-
-        self.df = self.original_df[mask].copy()
-        self.update_table()
+        # Фильтруем данные по заранее построенному индексу
+        # (после смены порогов он перестраивается при первом поиске)
+        if self.search_index is None:
+            from core.search_index import SearchIndex
+            self.search_index = SearchIndex(self.original_df, SEARCH_COLUMNS)
+        # Найденные строки показываются в текущем порядке сортировки
+        self._show_rows(self.search_index.search(query))
 
         # Обновляем счетчик найденных записей
         found_count = len(self.df)
@@ -289,127 +423,170 @@ class AppGUI:
     def load_sales_file(self):
         path = filedialog.askopenfilename(filetypes=[('Excel Files', '*.xlsx')])
         if path:
-            try:
-                load_sales_detailed(path)
-                self.sales_path = path
-                self.status_label.config(text='✅ Продажи загружены')
-            except Exception as e:
-                messagebox.showerror('Ошибка загрузки продаж', str(e))
+            self.status_label.config(text='⏳ Загрузка продаж...')
+            self.job_runner.submit(
+                'sales', self._load_file_job, path, 'sales',
+                on_done=lambda log: self._on_file_loaded('sales', path, log),
+                on_error=lambda e: self._on_job_error('Ошибка загрузки продаж', e),
+            )
 
     def load_stock_file(self):
         path = filedialog.askopenfilename(filetypes=[('Excel Files', '*.xlsx')])
         if path:
-            try:
-                load_stock(path)
-                self.stock_path = path
-                self.status_label.config(text='✅ Остатки загружены')
-            except Exception as e:
-                messagebox.showerror('Ошибка загрузки остатков', str(e))
+            self.status_label.config(text='⏳ Загрузка остатков...')
+            self.job_runner.submit(
+                'stock', self._load_file_job, path, 'stock',
+                on_done=lambda log: self._on_file_loaded('stock', path, log),
+                on_error=lambda e: self._on_job_error('Ошибка загрузки остатков', e),
+            )
+
+    def _load_file_job(self, context, path, kind):
+        """Фоновая задача: разбирает файл и кладёт результат в кэш; возвращает журнал этапов"""
+        context.progress('Разбор файла')
+        loader = _loader(kind)
+        with StageLog(Path(path).name) as log, profiled(loader.__name__):
+            self.dataset_cache.get(path, loader)
+        log.write()
+        return log
+
+    def _on_file_loaded(self, kind, path, log):
+        timing = f' ({log.summary()})' if log.records else ''
+        if kind == 'sales':
+            self.sales_path = path
+            self.status_label.config(text=f'✅ Продажи загружены{timing}')
+        else:
+            self.stock_path = path
+            self.status_label.config(text=f'✅ Остатки загружены{timing}')
+
+    def _on_job_error(self, title, error):
+        self.status_label.config(text=f'❌ {title}')
+        messagebox.showerror(title, str(error))
 
     def clear_search(self):
         """Очищает поиск и показывает все данные"""
         self.search_entry.delete(0, tk.END)
-        if not self.original_df.empty:
-            self.df = self.original_df.copy()
-            self.update_table()
+        if self._has_result():
+            self._show_rows()
             self.search_label.config(text='')
 
     def try_analyze(self):
         if not self.sales_path or not self.stock_path:
             return
 
-        try:
-            sales = load_sales_detailed(self.sales_path)
-            stock = load_stock(self.stock_path)
-
-            # ABC-анализ (без изменений)
-            abc_df = sales.groupby([
-                StandardColumns.ARTIKUL,
-                StandardColumns.NOMENCLATURA
-            ])[StandardColumns.SUMMA].sum().reset_index()
-            abc_df = self.abc_analyzer.analyze(abc_df)
-
-            # XYZ-анализ (ИСПРАВЛЕНО!)
-            monthly_sales = sales.groupby([
-                StandardColumns.ARTIKUL,
-                StandardColumns.NOMENCLATURA,
-                "Месяц"
-            ])[StandardColumns.SUMMA].sum().reset_index()
-
-            stats = monthly_sales.groupby([
-                StandardColumns.ARTIKUL,
-                StandardColumns.NOMENCLATURA
-            ])[StandardColumns.SUMMA].agg(['mean', 'std', 'count']).reset_index()
-
-            xyz_df = self.xyz_analyzer.analyze(stats)
-
-            # Объединяем результаты
-            df = pd.merge(
-                abc_df,
-                xyz_df[[StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA, StandardColumns.XYZ]],
-                on=[StandardColumns.ARTIKUL, StandardColumns.NOMENCLATURA],
-                how='left'
-            )
-            df = pd.merge(
-                df,
-                stock[[StandardColumns.ARTIKUL, StandardColumns.OSTATOK]],
-                on=StandardColumns.ARTIKUL,
-                how='left'
+        # Новый расчёт вытесняет незавершённый: его результат будет отброшен
+        self.job_runner.submit(
+            'analysis', self._analysis_job, self.config.thresholds, self.config.recommendations,
+            self.config.include_empty_months, self.sales_path, self.stock_path,
+            on_done=self._on_analysis_done,
+            on_error=lambda e: self._on_job_error('Ошибка анализа', e),
+            on_progress=lambda stage: self.status_label.config(text=f'⏳ {stage}...'),
+        )
+
+    def cancel_analysis(self):
+        """Отменяет выполняющийся расчёт"""
+        if self.job_runner.cancel('analysis'):
+            self.status_label.config(text='⛔ Расчёт отменён')
+
+    def _analysis_job(self, context, thresholds, recommendations, include_empty_months, sales_path, stock_path):
+        """Фоновая задача: загрузка и расчёт ABC/XYZ (без обращений к Tk)"""
+        from core.parallel_loader import load_cached
+        from core.pipeline import AnalysisPipeline
+        from core.search_index import SearchIndex
+        from core.threshold_tuner import ThresholdTuner
+        from gui.virtual_table import format_display_rows
+
+        context.progress('Проверка кэша')
+        pipeline = AnalysisPipeline(thresholds, recommendations, include_empty_months)
+        with StageLog('Расчёт') as log, profiled('analysis'):
+            with stage('Хэши файлов'):
+                sales_key = self.dataset_cache.digest(sales_path)
+                stock_key = self.dataset_cache.digest(stock_path)
+            # Нужные файлы разбираются одновременно, в отдельных процессах;
+            # дальше analyze получает их из кэша файлов
+            need_sales, need_stock = self.result_cache.missing_inputs(pipeline, sales_key, stock_key)
+            requests = [(path, _loader(kind)) for path, kind, needed in
+                        ((sales_path, 'sales', need_sales), (stock_path, 'stock', need_stock)) if needed]
+            if requests:
+                context.progress('Загрузка файлов')
+                load_cached(self.dataset_cache, requests, progress=context.progress)
+            df = self.result_cache.analyze(
+                pipeline, sales_key, stock_key,
+                lambda: self._load_cached(context, 'Загрузка продаж', sales_path, _loader('sales')),
+                lambda: self._load_cached(context, 'Загрузка остатков', stock_path, _loader('stock')),
+                progress=context.progress,
             )
-            df[StandardColumns.OSTATOK] = df[StandardColumns.OSTATOK].fillna(0)
 
-        except Exception as e:
-            messagebox.showerror('Ошибка анализа', str(e))
-            return
+            context.progress('Подготовка таблицы')
+            with stage('Подготовка таблицы', rows_in=len(df)):
+                display = format_display_rows(df)
+                search_index = SearchIndex(df, SEARCH_COLUMNS)
+                tuner = ThresholdTuner(df, pipeline.thresholds, pipeline.recommendations)
+        context.check_cancelled()
+        return df, display, search_index, tuner, log
+
+    def _load_cached(self, context, stage, path, loader):
+        context.progress(stage)
+        return self.dataset_cache.get(path, loader)
 
-        df['ABC_XYZ'] = df[StandardColumns.ABC] + df[StandardColumns.XYZ]
-
-        def get_recommendation(code):
-            match code:
-                case 'AX':
-                    return 'Держим как зеницу ока. Продаётся отлично — пусть лежит.'
-                case 'AY' | 'AZ':
-                    return 'Хитрый парень: спрос нестабильный. Запас — по ситуации.'
-                case 'BX':
-                    return 'Норм, но не шик. Присматривай.'
-                case 'BY' | 'BZ':
-                    return 'Ни рыба, ни мясо. Понаблюдай.'
-                case 'CX':
-                    return 'Эй, ты чего тут делаешь? Убираем из ассортимента.'
-                case 'CY' | 'CZ':
-                    return 'Серьёзно? Это ещё живо? Акции, уценка, распродажа!'
-                case _:
-                    return '¯\_(ツ)_/¯ Нужна экспертная оценка.'
-
-        df['Рекомендация'] = df['ABC_XYZ'].apply(get_recommendation)
+    def _on_analysis_done(self, result):
+        from core.sort_index import SortIndex
 
+        df, display, search_index, tuner, log = result
         # Сохраняем оригинальные данные для поиска
-        self.original_df = df.copy()
+        # (результат не изменяется на месте, поэтому копия не нужна)
+        self.original_df = df
+        self._display = display
+        self.search_index = search_index
+        self.tuner = tuner
+        # Перестановки строятся при первой сортировке по колонке
+        self.sort_index = SortIndex(df)
+        self.sort_keys = []
+        self._update_headings()
         self.df = df
-        self.update_table()
-        self.status_label.config(text=f'✅ Готово: {len(df)} позиций')
-
-        def get_recommendation(code):
-            match code:
-                case 'AX':
-                    return 'Держим как зеницу ока. Продаётся отлично — пусть лежит.'
-                case 'AY' | 'AZ':
-                    return 'Хитрый парень: спрос нестабильный. Запас — по ситуации.'
-                case 'BX':
-                    return 'Норм, но не шик. Присматривай.'
-                case 'BY' | 'BZ':
-                    return 'Ни рыба, ни мясо. Понаблюдай.'
-                case 'CX':
-                    return 'Эй, ты чего тут делаешь? Убираем из ассортимента.'
-                case 'CY' | 'CZ':
-                    return 'Серьёзно? Это ещё живо? Акции, уценка, распродажа!'
-                case _:
-                    return '¯\_(ツ)_/¯ Нужна экспертная оценка.'
-
-        df['Рекомендация'] = df['ABC_XYZ'].apply(get_recommendation)
-        self.df = df
-        self.update_table()
-        self.status_label.config(text=f'✅ Готово: {len(df)} позиций')
+        with log:
+            self.update_table()
+        log.write()
+        self.status_label.config(text=f'✅ Готово: {len(df)} позиций за {log.summary()}')
+        # Ползунки могли сдвинуть, пока шёл расчёт
+        self.on_thresholds_changed()
+
+    def on_thresholds_changed(self):
+        """Переклассифицирует текущий результат по порогам с ползунков"""
+        try:
+            thresholds = Thresholds(**{field: var.get() for field, var in self.threshold_vars.items()})
+        except (ValueError, tk.TclError):
+            return
+        # Следующий «Рассчитать» использует новые пороги
+        self.config.thresholds = thresholds
+
+        if self.tuner is None or thresholds == self.tuner.thresholds:
+            return
+        changed = self.tuner.update(thresholds)
+        if not len(changed):
+            return
+
+        import numpy as np
+        import pandas as pd
+        from core.threshold_tuner import CLASS_COLUMNS
+        # Позиции колонок, зависящих от порогов, в строках таблицы
+        class_table_columns = [TABLE_COLUMNS.index(col) for col in CLASS_COLUMNS]
+
+        # Форматируются только строки со сменившимся классом
+        for col, values in zip(class_table_columns, self.tuner.class_columns(changed).values()):
+            self._display[changed, col] = pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object)
+        self.original_df = self.tuner.apply(self.original_df)
+        self.search_index = None
+        self.sort_index.update(self.original_df, CLASS_COLUMNS)
+
+        if self.search_entry.get().strip():
+            # Классы участвуют в поиске: набор найденных строк мог измениться
+            self.apply_search()
+            return
+        # Порядок строк (в том числе после сортировки) сохраняется
+        positions = self.df.index.to_numpy()
+        self.df = self.original_df.iloc[positions]
+        self.table.rows[:, class_table_columns] = self._display[np.ix_(positions, class_table_columns)]
+        self.table.refresh()
 
     def update_table(self):
         """Обновляет таблицу и очищает выделение"""
@@ -418,35 +595,51 @@ class AppGUI:
         self.selected_item = None
         self.selected_column = None
 
-        self.tree.delete(*self.tree.get_children())
-        for _, row in self.df.iterrows():
-            values = [
-                row[StandardColumns.ARTIKUL],
-                row[StandardColumns.NOMENCLATURA],
-                f"{row[StandardColumns.SUMMA]:,.0f}".replace(',', ' '),  # Форматирование с пробелами
-                row[StandardColumns.ABC],
-                row[StandardColumns.XYZ],
-                f"{row[StandardColumns.OSTATOK]:,.0f}".replace(',', ' '),  # Форматирование с пробелами
-                row.get('ABC_XYZ', ''),
-                row.get('Рекомендация', '')
-            ]
-            self.tree.insert('', 'end', values=values)
+        # self.df — подмножество original_df с его индексом (RangeIndex),
+        # поэтому готовые строки берутся по позиции без повторного форматирования
+        with stage('Отрисовка таблицы', rows_in=len(self.df)):
+            if self._display is not None and len(self._display) == len(self.original_df):
+                rows = self._display[self.df.index.to_numpy()]
+            else:
+                from gui.virtual_table import format_display_rows
+                rows = format_display_rows(self.df)
+            self.table.set_rows(rows)
 
     def save_to_excel(self):
-        if self.df.empty:
+        if not self._has_result():
             messagebox.showinfo("Нет данных", "Сначала выполните анализ.")
             return
 
-        path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel файлы", "*.xlsx")])
+        path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel файлы", "*.xlsx"), ("CSV", "*.csv"), ("Parquet", "*.parquet")],
+        )
         if path:
-            try:
-                self.df.to_excel(path, index=False)
-                messagebox.showinfo("Успешно", f"Данные сохранены в файл:\n{path}")
-            except Exception as e:
-                messagebox.showerror("Ошибка сохранения", str(e))
+            # Сохраняется полный результат (не только найденные строки) со сводками
+            self.job_runner.submit(
+                'export', self._export_job, self.original_df, path,
+                on_done=self._on_export_done,
+                on_error=lambda e: self._on_job_error('Ошибка сохранения', e),
+                on_progress=lambda stage: self.status_label.config(text=f'⏳ {stage}...'),
+            )
+
+    def _export_job(self, context, df, path):
+        """Фоновая задача: запись результата в файл"""
+        from core.exporter import export_result
+        return export_result(df, path, progress=context.progress)
+
+    def _on_export_done(self, paths):
+        self.status_label.config(text=f'✅ Сохранено: {paths[0]}')
+        messagebox.showinfo("Успешно", "Данные сохранены в файл:\n" + "\n".join(paths))
 
     def run(self):
-        self.root.mainloop()
+        # Модули расчёта грузятся в фоне, когда окно уже показано
+        self.root.after(PRELOAD_DELAY_MS, self._start_preload)
+        try:
+            self.root.mainloop()
+        finally:
+            self.job_runner.shutdown()
 
 def run_app():
+    setup_logging()
     AppGUI().run()
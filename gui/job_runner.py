@@ -0,0 +1,121 @@
+import itertools
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Задача отменена пользователем или вытеснена более новой"""
+
+
+class JobContext:
+    """Передаётся в фоновую задачу: сообщает о прогрессе и проверяет отмену"""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._cancel_event = threading.Event()
+        self._events: "queue.Queue[str]" = queue.Queue()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """Прерывает задачу, если её отменили"""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, stage: str) -> None:
+        """Сообщает о начале этапа; вызывается из рабочего потока"""
+        self.check_cancelled()
+        self._events.put(stage)
+
+    def drain(self) -> list:
+        stages = []
+        while True:
+            try:
+                stages.append(self._events.get_nowait())
+            except queue.Empty:
+                return stages
+
+
+class JobRunner:
+    """Выполняет тяжёлые задачи вне потока Tk.
+
+    Задачи группируются по ключу (например, 'analysis'): новая задача с тем
+    же ключом отменяет предыдущую, и результат предыдущей отбрасывается.
+    Прогресс и результат доставляются в поток Tk опросом через root.after.
+    """
+
+    def __init__(self, root, poll_ms: int = 100, max_workers: int = 2):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='abc-xyz-job')
+        self._ids = itertools.count(1)
+        self._current: Dict[str, JobContext] = {}
+
+    def submit(self, key: str, func: Callable, *args,
+               on_done: Optional[Callable] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[str], None]] = None) -> int:
+        """Запускает func(context, *args) в фоне и возвращает id задачи"""
+        self.cancel(key)
+
+        context = JobContext(next(self._ids))
+        self._current[key] = context
+        future = self._executor.submit(func, context, *args)
+        self.root.after(self.poll_ms, self._poll, key, context, future, on_done, on_error, on_progress)
+        return context.job_id
+
+    def cancel(self, key: str) -> bool:
+        """Отменяет текущую задачу с ключом key; возвращает True, если она была"""
+        context = self._current.pop(key, None)
+        if context is None:
+            return False
+        context.cancel()
+        return True
+
+    def is_running(self, key: str) -> bool:
+        return key in self._current
+
+    def _is_current(self, key: str, context: JobContext) -> bool:
+        return self._current.get(key) is context
+
+    def _poll(self, key: str, context: JobContext, future: Future, on_done, on_error, on_progress):
+        stages = context.drain()
+        if not self._is_current(key, context):
+            # Задачу отменили или запустили новую — её результат больше не нужен
+            return
+
+        if stages and on_progress:
+            on_progress(stages[-1])
+
+        if not future.done():
+            self.root.after(self.poll_ms, self._poll, key, context, future, on_done, on_error, on_progress)
+            return
+
+        del self._current[key]
+        try:
+            result = future.result()
+        except JobCancelled:
+            return
+        except Exception as e:
+            logger.exception('Фоновая задача %s завершилась с ошибкой', key)
+            if on_error:
+                on_error(e)
+            return
+
+        if on_done:
+            on_done(result)
+
+    def shutdown(self) -> None:
+        for key in list(self._current):
+            self.cancel(key)
+        self._executor.shutdown(wait=False, cancel_futures=True)
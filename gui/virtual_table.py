@@ -0,0 +1,140 @@
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+
+from config.column_schema import StandardColumns
+
+if TYPE_CHECKING:
+    # Только для аннотаций: сами модули импортируются с первыми данными
+    import numpy as np
+    import pandas as pd
+
+TABLE_COLUMNS = ['Артикул', 'Номенклатура', 'Сумма', 'ABC', 'XYZ', 'Остаток', 'ABC_XYZ', 'Рекомендация']
+
+
+def _format_amount(values: "pd.Series") -> "pd.Series":
+    # Форматирование с пробелами между разрядами
+    return values.map('{:,.0f}'.format).str.replace(',', ' ', regex=False)
+
+
+def format_display_rows(df: "pd.DataFrame") -> "np.ndarray":
+    """Готовит строки для отображения разом для всей таблицы: массив (строки x колонки)"""
+    # numpy и pandas не нужны окну при запуске — импортируются с первыми данными
+    import numpy as np
+    import pandas as pd
+
+    columns = {
+        'Артикул': df[StandardColumns.ARTIKUL].astype(str),
+        'Номенклатура': df[StandardColumns.NOMENCLATURA].astype(str),
+        'Сумма': _format_amount(df[StandardColumns.SUMMA]),
+        'ABC': df[StandardColumns.ABC].astype(str),
+        'XYZ': df[StandardColumns.XYZ].astype(str),
+        'Остаток': _format_amount(df[StandardColumns.OSTATOK]),
+        'ABC_XYZ': df.get('ABC_XYZ', pd.Series('', index=df.index)).astype(str),
+        'Рекомендация': df.get('Рекомендация', pd.Series('', index=df.index)).astype(str),
+    }
+    rows = np.empty((len(df), len(TABLE_COLUMNS)), dtype=object)
+    for i, col in enumerate(TABLE_COLUMNS):
+        rows[:, i] = columns[col].to_numpy(dtype=object)
+    return rows
+
+
+class VirtualTable:
+    """Виртуальный режим для ttk.Treeview.
+
+    Источник данных — массив заранее отформатированных строк; в самом
+    Treeview существуют только строки видимой области и небольшой запас
+    под ней. Прокрутка лишь заменяет эти несколько строк. Идентификатор
+    элемента Treeview — номер строки в массиве, см. row_of().
+    """
+
+    def __init__(self, tree, scrollbar, buffer: int = 10,
+                 tags_for_row: Optional[Callable[[int], Sequence[str]]] = None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.buffer = buffer
+        self.tags_for_row = tags_for_row
+        self.rows = ()  # До первого set_rows; затем массив (строки x колонки)
+        self.first = 0
+        self._row_height = None
+        self._header_height = 0
+        self._rendered = None
+
+        # Полосой прокрутки управляет таблица, а не Treeview
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        self.scrollbar.config(command=self.yview)
+        self.tree.bind('<Configure>', lambda e: self.render())
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self._scroll(3))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def set_rows(self, rows: "np.ndarray", keep_position: bool = False) -> None:
+        """Заменяет данные таблицы; по умолчанию прокручивает к началу"""
+        self.rows = rows
+        if not keep_position:
+            self.first = 0
+        self._rendered = None
+        self.render()
+
+    def refresh(self) -> None:
+        """Перерисовывает видимые строки (после изменения self.rows на месте)"""
+        self._rendered = None
+        self.render()
+
+    def row_of(self, item: str) -> int:
+        """Номер строки данных для элемента Treeview"""
+        return int(item)
+
+    def row_values(self, row: int) -> tuple:
+        return tuple(self.rows[row])
+
+    def visible_count(self) -> int:
+        height = self.tree.winfo_height()
+        if self._row_height is None:
+            children = self.tree.get_children()
+            bbox = self.tree.bbox(children[0]) if children else None
+            if not bbox:
+                return int(self.tree.cget('height'))
+            self._header_height, self._row_height = bbox[1], bbox[3]
+        return max(1, (height - self._header_height) // self._row_height)
+
+    def render(self) -> None:
+        total = len(self.rows)
+        visible = self.visible_count()
+        self.first = min(max(0, self.first), max(0, total - visible))
+        window = (self.first, min(total, self.first + visible + self.buffer))
+
+        if window != self._rendered:
+            self.tree.delete(*self.tree.get_children())
+            for row in range(*window):
+                tags = self.tags_for_row(row) if self.tags_for_row else ()
+                self.tree.insert('', 'end', iid=str(row), values=list(self.rows[row]), tags=tags)
+            self.tree.yview_moveto(0)
+            self._rendered = window
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args) -> None:
+        """Обработчик команд полосы прокрутки ('moveto' / 'scroll')"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_count()
+            self.first += step
+        self.render()
+
+    def _scroll(self, units: int) -> str:
+        self.first += units
+        self.render()
+        return 'break'
+
+    def _on_mousewheel(self, event) -> str:
+        return self._scroll(-3 if event.delta > 0 else 3)
@@ -1,5 +1,11 @@
 # main.py
-from gui.app import run_app
+import sys
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        # Аргументы командной строки — пакетный режим без окна (см. cli.py)
+        from cli import main
+        sys.exit(main())
+
+    from gui.app import run_app
     run_app()
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+from core.dataset_cache import CACHE_VERSION, FRAME_SUFFIX, SIDECAR_PATTERN, DatasetCache
+
+
+def load_report(path):
+    return pd.DataFrame({'Артикул': [open(path, encoding='utf-8').read()], 'Количество': [1.0]})
+
+
+def write_reports(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f'report{i}.txt'
+        path.write_text(f'A{i}', encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+def sidecars(cache_dir):
+    return sorted(p.name for p in cache_dir.iterdir() if SIDECAR_PATTERN.match(p.name))
+
+
+def test_sidecars_are_capped_by_last_use(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    paths = write_reports(tmp_path, 4)
+    cache = DatasetCache(cache_dir, max_disk_entries=2)
+    for age, path in enumerate(paths[:2]):
+        cache.get(path, load_report)
+        sidecar = cache._sidecar_path(cache.digest(path), 'load_report')
+        os.utime(sidecar, (age, age))
+
+    # Чтение с диска обновляет дату обращения: report0 становится свежее report1
+    DatasetCache(cache_dir, max_disk_entries=2).get(paths[0], load_report)
+    cache.get(paths[2], load_report)
+
+    kept = {cache._sidecar_path(cache.digest(p), 'load_report').name for p in (paths[0], paths[2])}
+    assert set(sidecars(cache_dir)) == kept
+
+
+def test_stale_versions_are_removed(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    stale = cache_dir / f'{"0" * 40}_load_report_v{CACHE_VERSION - 1}{FRAME_SUFFIX}'
+    stale.write_bytes(b'')
+    # Файлы ResultCache в том же каталоге не трогаются
+    result = cache_dir / f'result_{"0" * 40}_v{CACHE_VERSION - 1}.pkl'
+    result.write_bytes(b'')
+
+    path, = write_reports(tmp_path, 1)
+    DatasetCache(cache_dir).get(path, load_report)
+
+    assert not stale.exists()
+    assert result.exists()
+    assert len(sidecars(cache_dir)) == 1
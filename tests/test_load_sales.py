@@ -0,0 +1,41 @@
+import logging
+
+import pandas as pd
+from config.column_schema import StandardColumns
+from config.schema import Thresholds
+from core.load_sales_detailed import parse_sales_frame
+from core.pipeline import AnalysisPipeline
+
+
+def make_raw(month_headers):
+    """Сырой лист продаж: склад, затем по месяцу две позиции (вторая — товар «Мартини»)"""
+    col0, col1, col2 = ['Отчёт о продажах', 'Склад 1'], [None, None], [None, None]
+    for i, header in enumerate(month_headers):
+        col0 += [header, 'art1, Товар 1', 'art2, Мартини']
+        col1 += [None, 1, 2]
+        col2 += [None, 100 + 10 * i, 50 * (i + 1)]
+    return pd.DataFrame({0: col0, 1: col1, 2: col2})
+
+
+def test_yearless_month_headers():
+    sales = parse_sales_frame(make_raw(['Январь', 'Февраль', 'Март']))
+
+    assert sales[StandardColumns.MESYAC].tolist() == [0, 0, 1, 1, 2, 2]
+    stock = pd.DataFrame({'Артикул': pd.Series(dtype=object), 'Остаток': pd.Series(dtype=float)})
+    df = AnalysisPipeline(Thresholds()).run(sales, stock)
+    assert df[StandardColumns.XYZ].notna().all()
+
+
+def test_dated_month_headers_are_chronological():
+    sales = parse_sales_frame(make_raw(['Декабрь 2023', 'Январь 2024']))
+
+    assert sales[StandardColumns.MESYAC].tolist() == [2023 * 12 + 11] * 2 + [2024 * 12] * 2
+
+
+def test_unrecognized_month_header_is_logged(caplog):
+    with caplog.at_level(logging.WARNING):
+        sales = parse_sales_frame(make_raw(['Период 1']))
+
+    assert sales[StandardColumns.MESYAC].isna().all()
+    assert 'строк без распознанного месяца: 2' in caplog.text
+    assert "'Период 1'" in caplog.text
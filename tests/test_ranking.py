@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from config.column_schema import StandardColumns
+from core.exporter import top_summary
+from core.ranking import RevenueRanking, revenue_share_positions, top_n
+
+
+def make_revenue(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    # Повторы выручки проверяют порядок при равных значениях
+    return rng.integers(0, 200, n).astype(float)
+
+
+def test_top_n_matches_full_ranking():
+    revenue = make_revenue()
+    ranking = RevenueRanking(revenue)
+
+    assert top_n(revenue, 100).tolist() == ranking.order[:100].tolist()
+
+
+def test_revenue_share_positions_reach_share():
+    revenue = make_revenue()
+    positions = revenue_share_positions(revenue, 0.8)
+
+    cum_share = RevenueRanking(revenue).cum_share()
+    assert positions.tolist() == RevenueRanking(revenue).order[:len(positions)].tolist()
+    assert cum_share[positions[-1]] >= 0.8
+    assert cum_share[positions[-2]] < 0.8
+
+
+def test_top_summary_per_warehouse():
+    revenue = make_revenue(300)
+    df = pd.DataFrame({
+        StandardColumns.SKLAD: np.repeat(['Склад 1', 'Склад 2', 'Склад 3'], 100),
+        StandardColumns.ARTIKUL: [f'art{i}' for i in range(300)],
+        StandardColumns.SUMMA: revenue,
+    })
+
+    top = top_summary(df, n=5)
+
+    expected = df.sort_values([StandardColumns.SKLAD, StandardColumns.SUMMA], ascending=[True, False], kind='stable')
+    expected = expected.groupby(StandardColumns.SKLAD).head(5)
+    assert top[StandardColumns.ARTIKUL].tolist() == expected[StandardColumns.ARTIKUL].tolist()
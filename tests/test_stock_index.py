@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from config.column_schema import StandardColumns
+from config.schema import Thresholds
+from core.file_loader import load_stock
+from core.pipeline import AnalysisPipeline
+from core.stock_index import StockIndex
+
+openpyxl = pytest.importorskip('openpyxl')
+
+# Один и тот же склад с разным регистром и пробелами
+STOCK_ROWS = [
+    ['Склад 1', 'ART1', 'Товар 1', 1],
+    ['СКЛАД 1', 'art1', 'Товар 1', 2],
+    ['Склад  2', 'ART1', 'Товар 1', 3],
+    [' склад 2 ', 'ART2', 'Товар 2', 4],
+]
+
+
+def write_stock(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for _ in range(4):
+        sheet.append([])
+    sheet.append(['Склад', 'Артикул', 'Номенклатура', 'Количество'])
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def test_warehouse_name_variants_are_one_key():
+    stock = pd.DataFrame(STOCK_ROWS, columns=['Склад', 'Артикул', 'Номенклатура', 'Остаток'])
+    stock['Артикул'] = stock['Артикул'].str.lower()
+    index = StockIndex(stock)
+
+    assert len(index) == 3
+    assert index.duplicates == 1
+    quantity, coverage = index.attach(pd.Series(['art1', 'art1', 'art2']), pd.Series(['Склад 1', 'склад 2', 'Склад 2']))
+    assert quantity.tolist() == [3.0, 3.0, 4.0]
+    assert len(coverage.unmatched_warehouses) == 0
+
+
+def test_load_stock_merges_warehouse_variants(tmp_path):
+    stock = load_stock(write_stock(tmp_path / 'stock.xlsx', STOCK_ROWS))
+
+    assert len(stock) == 3
+    totals = stock.groupby(stock[StandardColumns.ARTIKUL].astype(str), observed=True)[StandardColumns.OSTATOK].sum()
+    assert totals.to_dict() == {'art1': 6.0, 'art2': 4.0}
+
+
+def test_run_by_warehouse_with_warehouse_variants(tmp_path):
+    stock = load_stock(write_stock(tmp_path / 'stock.xlsx', STOCK_ROWS))
+    sales = pd.DataFrame({
+        'Склад': ['Склад 1', 'Склад 2', 'Склад 3'],
+        'Месяц': pd.array([24288, 24288, 24289], dtype='Int32'),
+        'Артикул': ['art1', 'art1', 'art2'],
+        'Номенклатура': ['Товар 1', 'Товар 1', 'Товар 2'],
+        'Количество': [1.0, 1.0, 1.0],
+        'Сумма': [10.0, 20.0, 30.0],
+    })
+
+    df, _ = AnalysisPipeline(Thresholds()).run_by_warehouse(sales, stock)
+
+    by_warehouse = df.set_index(['Склад', 'Артикул'])[StandardColumns.OSTATOK]
+    assert by_warehouse[('Склад 1', 'art1')] == 3.0
+    assert by_warehouse[('Склад 2', 'art1')] == 3.0
+    # Склада 3 нет в остатках — остаток артикула по сети
+    assert by_warehouse[('Склад 3', 'art2')] == 4.0